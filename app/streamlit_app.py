@@ -2,6 +2,7 @@ import altair as alt
 import pandas as pd
 import streamlit as st
 
+from finec.master import SecurityMaster
 from finec.moex import Index, Stock, bonds_dataframe, industry
 
 st.title("Акции, облигации и валюта (данные Московской биржи)")
@@ -112,14 +113,34 @@ st.subheader("Как получить котировки акции по тик
 #    - Показать последние цены и обороты
 #    - Сравнить с индексом Мосбиржи
 
+@st.cache(allow_output_mutation=True, show_spinner=False, ttl=24 * 60 * 60)
+def saved_master():
+    # Saved master only, building it downloads all listings and takes minutes.
+    # Build or refresh outside of the app with finec.master.build_master().
+    try:
+        return SecurityMaster.load()
+    except (FileNotFoundError, OSError):
+        return None
+
+
+def describe(ticker: str):
+    """Security type and name from saved master or from ISS description."""
+    master = saved_master()
+    if master is not None and ticker in master:
+        d = master.describe(ticker)
+        if isinstance(d.get("type_title"), str):
+            return d["type_title"], d["name"]
+    d = Stock(ticker).whoami()
+    return d["TYPENAME"], d["NAME"]
+
+
 random_tickers = sorted(imoex_df.sample(5).ticker.to_list())
 st.write("Примеры тикеров:", ", ".join(random_tickers))
 
 ticker = st.text_input("Введите тикер и нажмите Enter:")
 if ticker:
     s = Stock(ticker)
-    desc_dict = s.whoami()
-    st.write(desc_dict["TYPENAME"], desc_dict["NAME"])
+    st.write(*describe(ticker))
     ticker_df = s.get_history()
     st.line_chart(ticker_df["CLOSE"])
     button_donwload_csv(ticker_df, "ticker.csv")
@@ -0,0 +1,41 @@
+"""Import time of finec modules, measured with `python -X importtime`.
+
+  python benchmarks/bench_import.py
+
+Prints cumulative import time of each module and of its heaviest
+dependencies in a fresh interpreter.
+"""
+
+import subprocess
+import sys
+
+MODULES = ["finec.client", "finec.cache", "finec.moex", "finec.yield_curve"]
+DEPENDENCIES = ["pandas", "numpy", "requests", "apimoex", "bson", "httpx"]
+
+
+def import_times(module: str):
+    """Return dict of top-level module name to cumulative microseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        name = name.strip()
+        if cumulative.strip().isdigit():
+            times[name] = int(cumulative)
+    return times
+
+
+if __name__ == "__main__":
+    for module in MODULES:
+        times = import_times(module)
+        deps = ", ".join(
+            f"{d} {times[d] / 1000:.0f} ms" for d in DEPENDENCIES if d in times
+        )
+        print(f"{module:20} {times[module] / 1000:6.0f} ms  ({deps})")
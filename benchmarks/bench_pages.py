@@ -0,0 +1,36 @@
+"""Paginated history download: sequential pages vs concurrent pages by cursor.
+
+  python benchmarks/bench_pages.py
+
+Stand-in server answers with 20 ms latency and 3000 rows (30 pages),
+about the size of a 10-year daily history.
+"""
+
+import time
+
+from apimoex import ISSClient
+
+from finec.client import CLIENT, configure
+from finec.moex import get_pages
+
+from iss_server import serve
+
+
+def timed(func, *args):
+    t0 = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - t0, result
+
+
+if __name__ == "__main__":
+    server, base_url = serve(total=3000, latency=0.02)
+    configure(base_url=base_url)
+    url = CLIENT.url("/iss/history/engines/stock/markets/bonds/securities/SU26238RMFS4")
+    client = ISSClient(CLIENT.session, url)
+    before, a = timed(client.get_all)
+    after, b = timed(get_pages, client)
+    assert a == b
+    print(f"sequential pages: {before:6.3f} s")
+    print(f"concurrent pages: {after:6.3f} s")
+    print(f"speedup:          {before / after:6.2f}x")
+    server.shutdown()
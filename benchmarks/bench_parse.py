@@ -0,0 +1,56 @@
+"""Parsing a bonds market history: list of dicts vs compact column arrays.
+
+  python benchmarks/bench_parse.py
+"""
+
+import time
+
+import pandas as pd
+
+from finec.moex import as_date, frame
+
+# fmt: off
+COLUMNS = [
+    "BOARDID", "TRADEDATE", "SHORTNAME", "SECID", "NUMTRADES", "VALUE",
+    "CLOSE", "YIELDCLOSE", "MATDATE", "OFFERDATE", "BUYBACKDATE", "FACEUNIT",
+]
+# fmt: on
+N = 50_000
+
+
+def make_block(n=N):
+    data = [
+        [
+            "TQCB", "2022-09-28", f"Bond{i % 3000}", f"RU000A{i % 3000:06d}",
+            i, 1e6 + i, 99.5, 12.3, "2027-03-26",
+            "0000-00-00" if i % 2 else "2024-01-01", None, "SUR",
+        ]
+        for i in range(n)
+    ]
+    return {"columns": COLUMNS, "data": data}
+
+
+def old_dataframe(json_dict):
+    # finec.moex.dataframe() before columnar parsing
+    df = pd.DataFrame(json_dict)
+    df["TRADEDATE"] = pd.to_datetime(df["TRADEDATE"])
+    df = df.set_index("TRADEDATE")
+    for col in ["MATDATE", "OFFERDATE", "BUYBACKDATE"]:
+        df[col] = df[col].map(as_date)
+    return df
+
+
+def timed(func, arg):
+    t0 = time.perf_counter()
+    df = func(arg)
+    return time.perf_counter() - t0, df.memory_usage(deep=True).sum() / 1e6
+
+
+if __name__ == "__main__":
+    block = make_block()
+    records = [dict(zip(block["columns"], row)) for row in block["data"]]
+    before, mb_before = timed(old_dataframe, records)
+    after, mb_after = timed(frame, block)
+    print(f"list of dicts + as_date: {before:6.3f} s {mb_before:6.1f} MB")
+    print(f"column arrays:           {after:6.3f} s {mb_after:6.1f} MB")
+    print(f"speedup:                 {before / after:6.2f}x")
@@ -0,0 +1,47 @@
+"""Requests per second: new requests.Session per call vs shared pooled client.
+
+  python benchmarks/bench_session.py
+
+Runs against a local plain-HTTP stand-in server, so the gap shown is the
+TCP handshake only; against https://iss.moex.com each new session also pays
+a TLS handshake and the difference is larger.
+"""
+
+import time
+
+import requests
+from apimoex import ISSClient
+
+from finec.client import CLIENT, configure
+
+from iss_server import serve
+
+N = 500
+
+
+def fresh_session_get(url):
+    with requests.Session() as session:
+        return ISSClient(session, url).get()
+
+
+def shared_session_get(url):
+    return ISSClient(CLIENT.session, url).get()
+
+
+def rate(func, url, n=N):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        func(url)
+    return n / (time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+    server, base_url = serve()
+    configure(base_url=base_url)
+    url = CLIENT.url("/iss/history/engines/stock/markets/shares/securities/SBER")
+    before = rate(fresh_session_get, url)
+    after = rate(shared_session_get, url)
+    print(f"new session per request: {before:8.1f} req/s")
+    print(f"shared pooled session:   {after:8.1f} req/s")
+    print(f"speedup:                 {after / before:8.2f}x")
+    server.shutdown()
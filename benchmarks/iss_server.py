@@ -0,0 +1,86 @@
+"""Local stand-in for iss.moex.com used by benchmarks.
+
+Answers any `/iss/...json` path with a paginated `history` block of
+*total* rows in either extended (apimoex) or compact ISS format,
+including the `history.cursor` block.
+
+  python benchmarks/iss_server.py 8765
+"""
+
+import json
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+COLUMNS = ["BOARDID", "TRADEDATE", "SECID", "CLOSE", "VOLUME"]
+PAGESIZE = 100
+
+
+def make_row(i: int, secid: str):
+    day = date(2010, 1, 1) + timedelta(days=i)
+    return ["TQBR", day.isoformat(), secid, 100.0 + i / 10, 1000 + i]
+
+
+def make_payload(path: str, query: dict, total: int):
+    start = int(query.get("start", ["0"])[0])
+    secid = path.rstrip("/").split("/")[-1].replace(".json", "")
+    rows = [make_row(i, secid) for i in range(start, min(start + PAGESIZE, total))]
+    cursor_columns = ["INDEX", "TOTAL", "PAGESIZE"]
+    cursor_row = [start, total, PAGESIZE]
+    if query.get("iss.json", [""])[0] == "extended":
+        return [
+            {"charsetinfo": {"name": "utf-8"}},
+            {
+                "history": [dict(zip(COLUMNS, row)) for row in rows],
+                "history.cursor": [dict(zip(cursor_columns, cursor_row))],
+            },
+        ]
+    return {
+        "history": {"columns": COLUMNS, "data": rows},
+        "history.cursor": {"columns": cursor_columns, "data": [cursor_row]},
+    }
+
+
+def make_handler(total: int, latency: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if latency:
+                time.sleep(latency)
+            body = json.dumps(make_payload(url.path, parse_qs(url.query), total))
+            content = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(port: int = 0, total: int = 1, latency: float = 0.0):
+    """Start server in a background thread, return (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(total, latency))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, "http://127.0.0.1:{}".format(server.server_address[1])
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    server, base_url = serve(port)
+    print("Serving ISS stand-in at", base_url)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -30,17 +30,9 @@ class Futures(Security):
 Futures("SiM2").get_history().dropna()
 
 #%%
-from finec.moex import get_engines, Board, Engine, Market
-
-for e in get_engines():
-    for m in Engine(e).markets():
-        for b_name in Market(e, m).traded_boards():
-            b = Board(e, m, b_name)
-            v = b.volume()
-            if v:
-                print(b, v)
-                b.__dict__
-
-# need: Board.volume()
+from finec.scan import scan_boards
+
+# volume and value by board for all engines and markets
+print(scan_boards())
 
 # %%
@@ -0,0 +1,225 @@
+"""finec.aio - Asynchronous ISS requests for many tickers at once.
+
+Downloads run concurrently under a semaphore and a requests-per-second
+limit, results are the same dataframes as `finec.moex.dataframe()` makes.
+
+  from finec.aio import quote_many
+  from finec.moex import stocks_board
+
+  dfs = quote_many(stocks_board(), ["SBER", "GAZP", "LKOH"], start="2022-01-01")
+  dfs["SBER"]
+
+In a running event loop use `await async_quote_many(...)` or
+`await Stock("SBER").aget_history(iss=iss)` with one shared `AsyncISS`:
+
+  async with AsyncISS() as iss:
+      dfs = await asyncio.gather(*[s.aget_history(iss=iss) for s in stocks])
+"""
+
+import asyncio
+import time
+from typing import Dict, Iterable, List, Optional
+
+import httpx
+from apimoex.client import BASE_QUERY, ISSMoexError
+
+from finec.cache import CACHE
+from finec.client import CLIENT, RETRY_STATUSES
+from finec.moex import (
+    dataframe,
+    history_endpoint,
+    make_query_dict,
+    merge_pages,
+    read_cursor,
+)
+
+__all__ = [
+    "AsyncISS",
+    "async_quote",
+    "async_quote_json_many",
+    "async_quote_many",
+    "quote_json_many",
+    "quote_many",
+]
+
+MAX_CONCURRENCY = 8
+RATE = 20.0  # requests per second
+
+
+def loop_is_running() -> bool:
+    """True inside a running event loop, as in Jupyter, where `asyncio.run()` fails."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class RateLimiter:
+    """Allow no more than *rate* request starts per second."""
+
+    def __init__(self, rate: Optional[float] = RATE):
+        self.interval = 1 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def wait(self):
+        if not self.interval:
+            return
+        # created in running loop, on Python 3.8-3.9 a lock binds to a loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class AsyncISS:
+    """Asynchronous counterpart of `apimoex.ISSClient` with shared connections.
+
+    Uses base url, pool size, retries and timeout from `finec.client.CLIENT`.
+    Responses with status 429 and 5xx are retried with exponential backoff,
+    same as in the synchronous client. Cache lookups run in a thread, not
+    in the event loop.
+    """
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, rate=RATE):
+        settings = CLIENT.settings
+        self.base_url = settings.base_url
+        self.retries = settings.retries
+        self.backoff_factor = settings.backoff_factor
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.limiter = RateLimiter(rate)
+        limits = httpx.Limits(
+            max_connections=max(settings.pool_maxsize, max_concurrency),
+            max_keepalive_connections=settings.pool_maxsize
+            if settings.keep_alive
+            else 0,
+        )
+        self.client = httpx.AsyncClient(
+            timeout=settings.timeout,
+            transport=httpx.AsyncHTTPTransport(retries=settings.retries, limits=limits),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        await self.client.aclose()
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # created in running loop, see RateLimiter.wait()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def url(self, endpoint: str) -> str:
+        return self.base_url + endpoint + ".json"
+
+    async def request(self, url: str, query: Dict) -> httpx.Response:
+        for attempt in range(self.retries + 1):
+            async with self.semaphore:
+                await self.limiter.wait()
+                r = await self.client.get(url, params=query)
+            if r.status_code not in RETRY_STATUSES or attempt == self.retries:
+                return r
+            await asyncio.sleep(self.backoff_factor * 2 ** attempt)
+        return r
+
+    async def get(self, endpoint: str, param: Dict = {}, start: int = 0):
+        url = self.url(endpoint)
+        query = dict(**BASE_QUERY, **param)
+        if start:
+            query["start"] = start
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(None, CACHE.get, url, query)
+        if data is not None:
+            return data
+        r = await self.request(url, query)
+        if r.is_error:
+            raise ISSMoexError("Неверный url", str(r.url))
+        _, data, *wrong_data = r.json()
+        if wrong_data:
+            raise ISSMoexError("Ответ содержит некорректные данные", str(r.url))
+        await loop.run_in_executor(None, CACHE.put, url, query, data)
+        return data
+
+    async def get_all(self, endpoint: str, param: Dict = {}):
+        # Same result as finec.moex.get_pages(), pages after cursor are concurrent
+        first = await self.get(endpoint, param)
+        cursor = read_cursor(first)
+        if cursor:
+            size = cursor["PAGESIZE"]
+            starts = range(cursor["INDEX"] + size, cursor["TOTAL"], size)
+            rest = await asyncio.gather(
+                *[self.get(endpoint, param, start) for start in starts]
+            )
+            return merge_pages([first, *rest])
+        pages = [first]
+        start = 0
+        while pages[-1]:
+            block_size = len(next(iter(pages[-1].values())))
+            if not block_size:
+                break
+            start += block_size
+            pages.append(await self.get(endpoint, param, start))
+        return merge_pages(pages)
+
+
+async def async_quote(iss: AsyncISS, board, ticker: str, columns=[], start="", end=""):
+    endpoint = history_endpoint(board.engine, board.market, board.board, ticker)
+    param = make_query_dict(columns, start, end)
+    return (await iss.get_all(endpoint, param))["history"]
+
+
+async def async_quote_json_many(
+    board,
+    tickers: Iterable[str],
+    columns=[],
+    start="",
+    end="",
+    max_concurrency: int = MAX_CONCURRENCY,
+    rate=RATE,
+) -> Dict[str, List]:
+    tickers = list(tickers)
+    async with AsyncISS(max_concurrency, rate) as iss:
+        jsons = await asyncio.gather(
+            *[async_quote(iss, board, t, columns, start, end) for t in tickers]
+        )
+    return dict(zip(tickers, jsons))
+
+
+async def async_quote_many(
+    board,
+    tickers: Iterable[str],
+    columns=[],
+    start="",
+    end="",
+    max_concurrency: int = MAX_CONCURRENCY,
+    rate=RATE,
+):
+    """Return dictionary of history dataframes by ticker for *board*."""
+    jsons = await async_quote_json_many(
+        board, tickers, columns, start, end, max_concurrency, rate
+    )
+    return {ticker: dataframe(json) for ticker, json in jsons.items()}
+
+
+def quote_many(board, tickers, columns=[], start="", end="", **kwargs):
+    """Blocking wrapper around `async_quote_many()`."""
+    return asyncio.run(async_quote_many(board, tickers, columns, start, end, **kwargs))
+
+
+def quote_json_many(board, tickers, columns=[], start="", end="", **kwargs):
+    """Blocking wrapper around `async_quote_json_many()`."""
+    return asyncio.run(
+        async_quote_json_many(board, tickers, columns, start, end, **kwargs)
+    )
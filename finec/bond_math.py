@@ -0,0 +1,186 @@
+"""finec.bond_math - Yield to maturity, duration, convexity and z-spread for many bonds.
+
+Cash flows of all bonds are laid out as padded matrices: row is a bond,
+column is a payment, `T` holds years to payment and `C` holds amounts
+(zero for padding). Yields are effective annual rates, as in ISS
+`YIELDCLOSE`, and are solved for all bonds at once with Newton iterations.
+
+  from finec.moex import corporate_bonds_board, bond_prices
+  from finec.bond_math import board_analytics
+  from finec.yield_curve import YieldCurve
+
+  prices = bond_prices(corporate_bonds_board())
+  board_analytics(prices, cashflows, curve=YieldCurve("2022-09-28").curve)
+
+*cashflows* is a table with `secid`, `date` and `value` columns - coupons,
+amortizations and redemptions in bond currency. ISS gives no value for
+coupons that are not announced yet; bonds with such a payment after
+settlement get NaN yield, durations and spread unless missing values are
+filled by the caller.
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+__all__ = [
+    "cashflow_matrix",
+    "present_value",
+    "ytm",
+    "durations",
+    "convexity",
+    "z_spread",
+    "board_analytics",
+]
+
+DAYS_IN_YEAR = 365
+TOLERANCE = 1e-10
+MAX_ITER = 50
+
+
+def cashflow_matrix(
+    cashflows: pd.DataFrame, secids: List[str], settle
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Years to payment `T` and amounts `C`, shape (len(secids), max payments).
+
+    *settle* is one date or a date for each of *secids*; only payments
+    after settlement are kept. Unknown (NaN) payments stay NaN in `C`.
+    """
+    secids = pd.Index(secids)
+    settle = np.broadcast_to(np.asarray(settle, dtype="datetime64[D]"), (len(secids),))
+    rows = secids.get_indexer(cashflows["secid"])
+    dates = pd.to_datetime(cashflows["date"]).to_numpy().astype("datetime64[D]")
+    keep = rows >= 0
+    keep[keep] = dates[keep] > settle[rows[keep]]
+    values = pd.Series(cashflows["value"].to_numpy(dtype=float)[keep])
+    # coupon and redemption on the same date make one payment,
+    # unknown if any part of it is unknown
+    groups = [rows[keep], dates[keep]]
+    flows = values.groupby(groups).sum()
+    unknown = values.isna().groupby(groups).any()
+    rows = flows.index.get_level_values(0).to_numpy()
+    dates = flows.index.get_level_values(1).to_numpy().astype("datetime64[D]")
+    values = flows.where(~unknown).to_numpy()
+    # position of each payment within its bond
+    starts = np.searchsorted(rows, np.arange(len(secids)))
+    cols = np.arange(len(rows)) - starts[rows]
+    width = cols.max() + 1 if len(cols) else 0
+    T = np.ones((len(secids), width))
+    C = np.zeros((len(secids), width))
+    T[rows, cols] = (dates - settle[rows]).astype(float) / DAYS_IN_YEAR
+    C[rows, cols] = values
+    return T, C
+
+
+def discount_factors(T, y):
+    return (1 + np.asarray(y, dtype=float)[..., None]) ** -T
+
+
+def present_value(C, T, y) -> np.ndarray:
+    return (C * discount_factors(T, y)).sum(axis=-1)
+
+
+def newton(f, fprime, x0, tol=TOLERANCE, max_iter=MAX_ITER) -> np.ndarray:
+    """Solve f(x) = 0 elementwise, NaN where iterations do not converge."""
+    x = np.array(x0, dtype=float)
+    active = np.isfinite(x)
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        step = f(x, active) / fprime(x, active)
+        x[active] = np.maximum(x[active] - step, -0.99)
+        done = ~(np.abs(step) > tol)
+        active[np.flatnonzero(active)[done]] = False
+    x[active] = np.nan
+    return x
+
+
+def ytm(C, T, price, guess=0.1, **kwargs) -> np.ndarray:
+    """Effective annual yield that discounts *C* to dirty *price*."""
+    C, T = np.atleast_2d(C), np.atleast_2d(T)
+    price = np.broadcast_to(np.asarray(price, dtype=float), (len(C),))
+    x0 = np.where(np.isfinite(price) & (C.sum(axis=1) > 0), guess, np.nan)
+
+    def f(y, i):
+        return present_value(C[i], T[i], y[i]) - price[i]
+
+    def fprime(y, i):
+        return -(T[i] * C[i] * discount_factors(T[i] + 1, y[i])).sum(axis=1)
+
+    return newton(f, fprime, x0, **kwargs)
+
+
+def durations(C, T, y) -> Tuple[np.ndarray, np.ndarray]:
+    """Macaulay and modified duration in years."""
+    y = np.asarray(y, dtype=float)
+    pv = C * discount_factors(T, y)
+    macaulay = (T * pv).sum(axis=-1) / pv.sum(axis=-1)
+    return macaulay, macaulay / (1 + y)
+
+
+def convexity(C, T, y) -> np.ndarray:
+    y = np.asarray(y, dtype=float)
+    pv = C * discount_factors(T, y)
+    return (T * (T + 1) * pv).sum(axis=-1) / pv.sum(axis=-1) / (1 + y) ** 2
+
+
+def zero_rates(T, curve) -> np.ndarray:
+    """Annually compounded zero-coupon rates of *curve* at *T*, fractions."""
+    return curve.rate(T.ravel()).reshape(T.shape) / 10_000
+
+
+def z_spread(C, T, price, curve, **kwargs) -> np.ndarray:
+    """Constant spread over *curve* zero rates that gives dirty *price*."""
+    C, T = np.atleast_2d(C), np.atleast_2d(T)
+    price = np.broadcast_to(np.asarray(price, dtype=float), (len(C),))
+    R = zero_rates(T, curve)
+    x0 = np.where(np.isfinite(price) & (C.sum(axis=1) > 0), 0.0, np.nan)
+
+    def f(z, i):
+        return (C[i] * (1 + R[i] + z[i, None]) ** -T[i]).sum(axis=1) - price[i]
+
+    def fprime(z, i):
+        return -(T[i] * C[i] * (1 + R[i] + z[i, None]) ** (-T[i] - 1)).sum(axis=1)
+
+    return newton(f, fprime, x0, **kwargs)
+
+
+def dirty_prices(prices: pd.DataFrame) -> np.ndarray:
+    """CLOSE in percent of FACEVALUE plus accrued interest ACCINT."""
+    close = prices["CLOSE"].to_numpy(dtype=float)
+    face = prices["FACEVALUE"].to_numpy(dtype=float)
+    return close / 100 * face + prices["ACCINT"].fillna(0).to_numpy(dtype=float)
+
+
+def board_analytics(
+    prices: pd.DataFrame, cashflows: pd.DataFrame, settle=None, curve=None
+) -> pd.DataFrame:
+    """Yield, durations, convexity and z-spread for every bond in *prices*.
+
+    *prices* has one row per bond with SECID, CLOSE, ACCINT and FACEVALUE, like
+    `bond_prices()`. Settlement defaults to trade dates in *prices* index.
+    Yields and spreads are fractions, 0.08 is 8%. Bonds with unknown future
+    payments in *cashflows* get NaN.
+    """
+    secids = prices["SECID"].astype(str).tolist()
+    if settle is None:
+        settle = prices.index.to_numpy().astype("datetime64[D]")
+    T, C = cashflow_matrix(cashflows, secids, settle)
+    price = dirty_prices(prices)
+    y = ytm(C, T, price)
+    macaulay, modified = durations(C, T, y)
+    df = pd.DataFrame(
+        dict(
+            SECID=secids,
+            PRICE=price,
+            YTM=y,
+            DURATION=macaulay,
+            MODIFIED_DURATION=modified,
+            CONVEXITY=convexity(C, T, y),
+        ),
+        index=prices.index,
+    )
+    if curve is not None:
+        df["ZSPREAD"] = z_spread(C, T, price, curve)
+    return df
@@ -0,0 +1,119 @@
+"""finec.bondization - Coupon, amortization and offer schedules of bonds.
+
+Schedules come from `/iss/securities/{secid}/bondization` and are cached
+on disk for a week (see `finec.cache`). Many bonds are requested
+concurrently and collected into columnar tables keyed by `secid`:
+
+- `cashflows` - secid, date, kind ("coupon" or "amortization"), value, valueprc;
+  value is NaN for coupons not announced yet
+- `offers` - secid, date, offertype, price
+
+  from finec.moex import Markets
+  from finec.bondization import bondization_many
+
+  s = bondization_many(Markets.bonds.board("TQCB").tickers())
+  s.cashflows  # feeds finec.bond_math.board_analytics()
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List
+
+import pandas as pd
+
+from finec.moex import MAX_WORKERS, as_dates, get_compact
+
+__all__ = ["Schedules", "bondization", "bondization_many"]
+
+BLOCKS = ["coupons", "amortizations", "offers"]
+
+# (block, date column, value columns) of each table
+CASHFLOW_BLOCKS = [
+    ("coupons", "coupondate", "coupon"),
+    ("amortizations", "amortdate", "amortization"),
+]
+CASHFLOW_COLUMNS = ["value", "valueprc"]
+OFFER_COLUMNS = ["offertype", "price"]
+
+
+def bondization_json(secid: str) -> Dict:
+    param = {"iss.only": ",".join(BLOCKS), "limit": "unlimited"}
+    return get_compact(f"/iss/securities/{secid}/bondization", param)
+
+
+def pick(block: Dict, names: List[str]) -> Dict[str, List]:
+    """Columns *names* of a compact *block*, None if column is absent."""
+    index = {name: i for i, name in enumerate(block["columns"])}
+    data = block["data"]
+    return {
+        name: [row[index[name]] for row in data] if name in index else [None] * len(data)
+        for name in names
+    }
+
+
+def collect(columns: Dict[str, List], more: Dict[str, List]):
+    for name, values in more.items():
+        columns.setdefault(name, []).extend(values)
+
+
+def cashflow_columns(secid: str, data: Dict, into: Dict[str, List]):
+    for block_name, date_column, kind in CASHFLOW_BLOCKS:
+        block = data.get(block_name, {"columns": [], "data": []})
+        values = pick(block, [date_column] + CASHFLOW_COLUMNS)
+        n = len(block["data"])
+        collect(into, dict(secid=[secid] * n, date=values.pop(date_column), kind=[kind] * n))
+        collect(into, values)
+
+
+def offer_columns(secid: str, data: Dict, into: Dict[str, List]):
+    block = data.get("offers", {"columns": [], "data": []})
+    values = pick(block, ["offerdate"] + OFFER_COLUMNS)
+    n = len(block["data"])
+    collect(into, dict(secid=[secid] * n, date=values.pop("offerdate")))
+    collect(into, values)
+
+
+def make_table(columns: Dict[str, List], names: List[str]) -> pd.DataFrame:
+    df = pd.DataFrame({name: columns.get(name, []) for name in names})
+    df["secid"] = df["secid"].astype("category")
+    df["date"] = as_dates(df["date"])
+    for col in ["kind", "offertype"]:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    for col in ["value", "valueprc", "price"]:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df.sort_values(["secid", "date"], kind="stable").reset_index(drop=True)
+
+
+@dataclass
+class Schedules:
+    cashflows: pd.DataFrame
+    offers: pd.DataFrame
+
+    @classmethod
+    def from_jsons(cls, jsons: Dict[str, Dict]):
+        flows: Dict[str, List] = {}
+        offers: Dict[str, List] = {}
+        for secid, data in jsons.items():
+            cashflow_columns(secid, data, flows)
+            offer_columns(secid, data, offers)
+        return cls(
+            cashflows=make_table(flows, ["secid", "date", "kind"] + CASHFLOW_COLUMNS),
+            offers=make_table(offers, ["secid", "date"] + OFFER_COLUMNS),
+        )
+
+    def secids(self) -> List[str]:
+        return self.cashflows["secid"].cat.categories.tolist()
+
+
+def bondization(secid: str) -> Schedules:
+    return Schedules.from_jsons({secid: bondization_json(secid)})
+
+
+def bondization_many(secids: Iterable[str], max_workers: int = MAX_WORKERS) -> Schedules:
+    """Schedules for all *secids*, one concurrent request per bond."""
+    secids = list(dict.fromkeys(secids))
+    with ThreadPoolExecutor(max_workers) as pool:
+        jsons = dict(zip(secids, pool.map(bondization_json, secids)))
+    return Schedules.from_jsons(jsons)
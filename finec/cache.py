@@ -0,0 +1,272 @@
+"""finec.cache - Persistent on-disk cache for ISS responses.
+
+Responses are stored in an SQLite file under `local_directory()`, keyed
+by url and query parameters. Time to live depends on endpoint:
+
+- reference data (engines, markets, boards) and bond schedules - one week
+- security descriptions and index analytics - one day, analytics for past
+  dates forever
+- history and candles - 15 minutes, forever if the requested period is closed
+  (`till` or `date` parameter before today in Moscow)
+- zero-coupon yield curve - forever for past dates, today is not cached
+  as intraday parameters change every few minutes
+- board securities and market data - 10 seconds
+- other endpoints are not cached
+
+When file grows over `max_bytes`, least recently used responses are evicted.
+
+  from finec import cache
+
+  cache.configure(max_bytes=500_000_000)
+  cache.disable()
+  cache.clear()
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlparse
+
+from apimoex import ISSClient
+
+from finec.directory import local_directory
+
+__all__ = ["ResponseCache", "CachedISSClient", "CACHE", "configure", "disable", "clear"]
+
+FOREVER = float("inf")
+MINUTE = 60
+DAY = 24 * 60 * MINUTE
+
+MOSCOW = timezone(timedelta(hours=3))
+
+
+def moscow_today() -> str:
+    return datetime.now(MOSCOW).date().isoformat()
+
+
+def is_closed_period(param: Dict) -> bool:
+    """True if query asks for dates strictly before today."""
+    last_date = param.get("till") or param.get("date")
+    return bool(last_date) and str(last_date) < moscow_today()
+
+
+def history_ttl(param: Dict) -> float:
+    return FOREVER if is_closed_period(param) else 15 * MINUTE
+
+
+def analytics_ttl(param: Dict) -> float:
+    return FOREVER if is_closed_period(param) else DAY
+
+
+def closed_only_ttl(param: Dict) -> float:
+    return FOREVER if is_closed_period(param) else 0
+
+
+def fixed(seconds: float) -> Callable[[Dict], float]:
+    return lambda param: seconds
+
+
+# First matching rule gives time to live in seconds, 0 means do not cache
+TTL_RULES: List[Tuple[str, Callable[[Dict], float]]] = [
+    (r"^/iss/history/engines/stock/zcyc$", closed_only_ttl),
+    (r"^/iss/history/", history_ttl),
+    (r"^/iss/engines/.*/candles$", history_ttl),
+    (r"^/iss/engines(/[^/]+(/markets(/[^/]+(/boards(/[^/]+)?)?)?)?)?/?$", fixed(7 * DAY)),
+    (r"^/iss/engines/.*/securities$", fixed(10)),
+    (r"^/iss/securities/[^/]+$", fixed(DAY)),
+    (r"^/iss/securities/[^/]+/bondization$", fixed(7 * DAY)),
+    (r"^/iss/securities$", fixed(DAY)),
+    (r"^/iss/statistics/.*/analytics/", analytics_ttl),
+]
+
+
+def endpoint_of(url: str) -> str:
+    path = urlparse(url).path
+    return path[: -len(".json")] if path.endswith(".json") else path
+
+
+def ttl(url: str, param: Dict) -> float:
+    endpoint = endpoint_of(url)
+    for pattern, rule in TTL_RULES:
+        if re.search(pattern, endpoint):
+            return rule(param)
+    return 0
+
+
+def make_key(url: str, param: Dict) -> str:
+    return url + "?" + urlencode(sorted((k, str(v)) for k, v in param.items()))
+
+
+def default_path() -> Path:
+    return local_directory() / "finec_iss_cache.sqlite"
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+
+@dataclass
+class ResponseCache:
+    path: Optional[Path] = None
+    max_bytes: int = 200_000_000
+    enabled: bool = True
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        # running total of body sizes, summed over table on first use
+        self._total: Optional[int] = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # Called under self._lock
+        if self._conn is None or self._pid != os.getpid():
+            path = Path(self.path or default_path())
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+            self._pid = os.getpid()
+            self._total = None
+        return self._conn
+
+    def get(self, url: str, param: Dict):
+        """Return cached data or None if missing or expired."""
+        if not self.enabled:
+            return None
+        key = make_key(url, param)
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT body, expires, size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            body, expires, size = row
+            if expires < time.time():
+                self.connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.connection.commit()
+                if self._total is not None:
+                    self._total -= size
+                return None
+            self.connection.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key)
+            )
+            self.connection.commit()
+        return json.loads(zlib.decompress(body))
+
+    def put(self, url: str, param: Dict, data):
+        seconds = ttl(url, param)
+        if not self.enabled or not seconds:
+            return
+        body = zlib.compress(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+        now = time.time()
+        expires = now + seconds if seconds != FOREVER else FOREVER
+        key = make_key(url, param)
+        with self._lock:
+            conn = self.connection
+            if self._total is None:
+                self._total = self._sum()
+            old = conn.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, body, len(body), expires, now),
+            )
+            self._total += len(body) - (old[0] if old else 0)
+            if self._total > self.max_bytes:
+                self._evict()
+            conn.commit()
+
+    def _sum(self) -> int:
+        (total,) = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        return total
+
+    def _evict(self):
+        # other processes may write to the same file, start from actual total
+        total = self._sum()
+        self._total = total
+        if total <= self.max_bytes:
+            return
+        rows = self.connection.execute(
+            "SELECT key, size FROM responses ORDER BY accessed"
+        ).fetchall()
+        keys = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            keys.append((key,))
+            total -= size
+        self.connection.executemany("DELETE FROM responses WHERE key = ?", keys)
+        self._total = total
+
+    def size(self) -> int:
+        with self._lock:
+            return self._sum()
+
+    def clear(self):
+        with self._lock:
+            self.connection.execute("DELETE FROM responses")
+            self.connection.commit()
+            self.connection.execute("VACUUM")
+            self._total = 0
+
+
+CACHE = ResponseCache()
+
+
+class CachedISSClient(ISSClient):
+    """`apimoex.ISSClient` that reads and stores responses in *cache*."""
+
+    def __init__(self, session, url, query=None, cache: ResponseCache = CACHE):
+        super().__init__(session, url, query)
+        self.cache = cache
+
+    def get(self, start=None):
+        query = self._make_query(start)
+        data = self.cache.get(self._url, query)
+        if data is None:
+            data = self.fetch(start)
+            self.cache.put(self._url, query, data)
+        return data
+
+    def fetch(self, start=None):
+        return super().get(start)
+
+
+def configure(path=None, max_bytes=None, enabled=None) -> ResponseCache:
+    with CACHE._lock:
+        if path is not None:
+            CACHE.path = Path(path)
+            CACHE._conn = None
+        if max_bytes is not None:
+            CACHE.max_bytes = max_bytes
+        if enabled is not None:
+            CACHE.enabled = enabled
+    return CACHE
+
+
+def disable():
+    configure(enabled=False)
+
+
+def clear():
+    CACHE.clear()
@@ -0,0 +1,120 @@
+"""finec.client - HTTP client shared by all ISS requests.
+
+A single pooled requests.Session is reused across calls, so repeated
+requests to iss.moex.com keep TCP and TLS connections warm. No more than
+`pool_maxsize` requests are in flight at once across all threads, so nested
+thread pools neither overflow the connection pool nor overload the server.
+
+Change pool size, retries or timeouts for all subsequent requests:
+
+  from finec.client import configure
+
+  configure(pool_maxsize=32, retries=5, timeout=10)
+"""
+
+import os
+import threading
+from dataclasses import dataclass, replace
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+__all__ = ["Settings", "Client", "CLIENT", "configure", "session"]
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+@dataclass(frozen=True)
+class Settings:
+    base_url: str = "https://iss.moex.com"
+    pool_connections: int = 4
+    pool_maxsize: int = 16
+    keep_alive: bool = True
+    retries: int = 3
+    backoff_factor: float = 0.5
+    timeout: float = 30.0
+
+
+class TimeoutSession(requests.Session):
+    """Session that applies default *timeout* to every request and allows
+    no more than *max_requests* concurrent requests."""
+
+    def __init__(self, timeout: Optional[float] = None, max_requests: int = 16):
+        super().__init__()
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(max_requests)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        with self.slots:
+            return super().request(method, url, **kwargs)
+
+
+def make_session(settings: Settings) -> requests.Session:
+    retry = Retry(
+        total=settings.retries,
+        backoff_factor=settings.backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=settings.pool_connections,
+        pool_maxsize=settings.pool_maxsize,
+        max_retries=retry,
+    )
+    session = TimeoutSession(settings.timeout, settings.pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if not settings.keep_alive:
+        session.headers["Connection"] = "close"
+    return session
+
+
+class Client:
+    """Holds settings and lazily creates one session per process."""
+
+    def __init__(self, settings: Optional[Settings] = None):
+        self.settings = settings or Settings()
+        self._session: Optional[requests.Session] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        # Connections must not be shared with a forked child process
+        if self._session is None or self._pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._pid != os.getpid():
+                    self._session = make_session(self.settings)
+                    self._pid = os.getpid()
+        return self._session
+
+    def configure(self, **kwargs) -> Settings:
+        self.close()
+        self.settings = replace(self.settings, **kwargs)
+        return self.settings
+
+    def close(self):
+        with self._lock:
+            if self._session is not None and self._pid == os.getpid():
+                self._session.close()
+            self._session = None
+            self._pid = None
+
+    def url(self, endpoint: str) -> str:
+        return self.settings.base_url + endpoint + ".json"
+
+
+CLIENT = Client()
+
+
+def configure(**kwargs) -> Settings:
+    """Change settings of the shared client, eg. `configure(timeout=10)`."""
+    return CLIENT.configure(**kwargs)
+
+
+def session() -> requests.Session:
+    return CLIENT.session
@@ -1,63 +1,174 @@
 #%%
+import json
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
+from typing import Dict, Iterable
 
-import bson
+import numpy as np
 import pandas as pd
-import requests
 
 from finec.directory import local_directory
 
 DIVIDEND_URL = "https://github.com/WLM1ke/poptimizer/blob/master/dump/data_new/raw_div.bson?raw=true"
 
 
-def yield_dividends(url=DIVIDEND_URL):
-    r = requests.get(url)
-    for item in bson.decode_iter(r.content):
+def request_dump(url=DIVIDEND_URL, headers={}):
+    """Streamed response for dividend dump at *url*."""
+    from finec.client import CLIENT
+
+    r = CLIENT.session.get(url, headers=headers, stream=True)
+    r.raw.decode_content = True
+    return r
+
+
+def decode_dividends(stream):
+    """Decode BSON documents one by one from file-like *stream*."""
+    # bson is imported on first download only
+    import bson
+
+    for item in bson.decode_file_iter(stream):
         ticker = item["_id"]
         for div in item["df"]:
             div["ticker"] = ticker
             yield div
 
 
+def yield_dividends(url=DIVIDEND_URL):
+    with request_dump(url) as r:
+        r.raise_for_status()
+        yield from decode_dividends(r.raw)
+
+
 def query_dividend_from_web(url=DIVIDEND_URL) -> pd.DataFrame:
     gen = yield_dividends(url)
     return pd.DataFrame(gen)
 
 
+def file_format(filepath) -> str:
+    """"csv" for *.csv and compressed *.csv.gz, "parquet" for *.parquet."""
+    suffixes = [x.lower() for x in Path(filepath).suffixes]
+    if ".csv" in suffixes[-2:]:
+        return "csv"
+    if suffixes[-1:] in ([".parquet"], [".pq"]):
+        return "parquet"
+    raise ValueError(f"Dividend file must end with .csv or .parquet, got {filepath}")
+
+
 def save(df, filepath: str):
-    df.to_csv(filepath, index=False)
+    if file_format(filepath) == "csv":
+        df.to_csv(filepath, index=False)
+    else:
+        df.to_parquet(filepath, index=False)
 
 
 def read(filepath):
-    return pd.read_csv(filepath, parse_dates=["date"])
+    if file_format(filepath) == "csv":
+        return pd.read_csv(filepath, parse_dates=["date"])
+    return pd.read_parquet(filepath)
 
 
 def default_filepath():
-    return local_directory() / "dividend.csv"
+    return local_directory() / "dividend.parquet"
+
+
+def as_path(filepath: str = "") -> Path:
+    return default_filepath() if filepath == "" else Path(filepath)
+
+
+def validators_path(path: Path) -> Path:
+    return path.with_name(path.name + ".http.json")
+
+
+def read_validators(path: Path) -> Dict[str, str]:
+    try:
+        return json.loads(validators_path(path).read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def conditional_headers(validators: Dict[str, str]) -> Dict[str, str]:
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def refresh_dividends(filepath: str = "", url=DIVIDEND_URL) -> bool:
+    """Update local dividend file if dump on server has changed.
+
+    Sends ETag and Last-Modified of the previous download, so an unchanged
+    dump costs one 304 response. Returns True if file was rewritten.
+    """
+    path = as_path(filepath)
+    validators = read_validators(path) if path.exists() else {}
+    with request_dump(url, conditional_headers(validators)) as r:
+        if r.status_code == 304:
+            return False
+        r.raise_for_status()
+        df = pd.DataFrame(decode_dividends(r.raw))
+        validators = dict(
+            etag=r.headers.get("ETag"), last_modified=r.headers.get("Last-Modified")
+        )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    save(df, path)
+    validators_path(path).write_text(json.dumps(validators))
+    return True
 
 
 def get_dividend_all(filepath: str = ""):
-    if filepath == "":
-        path = default_filepath()
-    else:
-        path = Path(filepath)
-    if path.exists():
-        return read(path)
-    else:
-        df = query_dividend_from_web()
-        save(df, path)
-        return df
+    path = as_path(filepath)
+    if not path.exists():
+        refresh_dividends(path)
+    return read(path)
 
 
-#%%
+@dataclass
+class DividendTable:
+    """Dividends sorted by ticker and date with binary search by ticker."""
+
+    df: pd.DataFrame = field(repr=False)
 
-get_dividend_all("")
+    def __post_init__(self):
+        self.df = self.df.sort_values(["ticker", "date"], kind="mergesort")
+        self.df = self.df.reset_index(drop=True)
+        self.tickers = self.df["ticker"].to_numpy(dtype=str)
+
+    def get(self, ticker: str) -> pd.DataFrame:
+        i = np.searchsorted(self.tickers, ticker, side="left")
+        j = np.searchsorted(self.tickers, ticker, side="right")
+        return self.df.iloc[i:j]
+
+    def get_many(self, tickers: Iterable[str]) -> pd.DataFrame:
+        frames = [self.get(t) for t in dict.fromkeys(tickers)]
+        if not frames:
+            return self.df.iloc[0:0]
+        return pd.concat(frames, ignore_index=True)
+
+
+@lru_cache(maxsize=8)
+def _load_table(path: str, mtime: float) -> DividendTable:
+    return DividendTable(read(path))
+
+
+def dividend_table(filepath: str = "") -> DividendTable:
+    """Indexed dividend table, kept in memory until file at *filepath* changes."""
+    path = as_path(filepath)
+    if not path.exists():
+        get_dividend_all(str(path))
+    return _load_table(str(path), path.stat().st_mtime)
 
 
 #%%
-def erase_local_file():
-    # FIXME: must delete default_filepath().
-    pass
+def erase_local_file(filepath: str = ""):
+    """Delete local dividend file and its HTTP validators."""
+    path = as_path(filepath)
+    for p in [path, validators_path(path)]:
+        if p.exists():
+            p.unlink()
+    _load_table.cache_clear()
 
 
 def get_dividend(ticker: str, filepath: str = ""):
@@ -75,5 +186,10 @@ def get_dividend(ticker: str, filepath: str = ""):
     Data source: <https://github.com/WLM1ke/poptimizer/tree/master/dump/source>
     Columns: `ticker`, `date`, `dividends`, `currency`.
     """
-    df = get_dividend_all(filepath)
-    return df[df.ticker == ticker].sort_values("date", ascending=True)
+    return dividend_table(filepath).get(ticker)
+
+
+def get_dividends(tickers: Iterable[str], filepath: str = ""):
+    """Return dividends for many *tickers* as one dataframe, same columns
+    as `get_dividend()`, sorted by ticker and date."""
+    return dividend_table(filepath).get_many(tickers)
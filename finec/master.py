@@ -0,0 +1,219 @@
+"""finec.master - Security master table for offline descriptions and board lookup.
+
+Built from the bulk `/iss/securities` listing, requested page by page
+concurrently, and from security lists of all traded boards. Both tables
+are saved as Parquet in `local_directory()` and kept in memory with
+indexes by SECID, ISIN and REGNUMBER. Listing rows get `type_title`,
+readable security type from `/iss/index` (TYPENAME of `whoami()`).
+Saved tables older than a week
+are rebuilt on next call, so newly listed securities are found.
+
+  from finec.master import security_master
+
+  m = security_master()        # downloads on first call and once a week
+  m.describe("RU0009029540")   # SECID, ISIN or REGNUMBER
+  m.traded_boards("SBER")
+  m.enrich(df, on="SECID")     # join instead of one request per ticker
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from apimoex.client import ISSMoexError
+
+from finec.directory import local_directory
+from finec.moex import MAX_WORKERS, Board, get_compact
+
+__all__ = ["SecurityMaster", "security_master", "build_master"]
+
+LISTING_COLUMNS = [
+    "id",
+    "secid",
+    "shortname",
+    "regnumber",
+    "name",
+    "isin",
+    "is_traded",
+    "emitent_id",
+    "emitent_title",
+    "emitent_inn",
+    "emitent_okpo",
+    "gosreg",
+    "type",
+    "group",
+    "primary_boardid",
+    "marketprice_boardid",
+]
+KEYS = ["secid", "isin", "regnumber"]
+PAGE_SIZE = 100
+MAX_AGE = 7 * 24 * 60 * 60  # seconds
+
+
+def default_directory() -> Path:
+    return local_directory() / "finec_master"
+
+
+def listing_page(start: int) -> List[List]:
+    param = {
+        "iss.only": "securities",
+        "securities.columns": ",".join(LISTING_COLUMNS),
+        "start": start,
+        "limit": PAGE_SIZE,
+    }
+    return get_compact("/iss/securities", param)["securities"]["data"]
+
+
+def download_listing(max_workers: int = MAX_WORKERS) -> pd.DataFrame:
+    """All securities of `/iss/securities`, pages requested in concurrent waves.
+
+    Listing has no cursor, so waves of *max_workers* pages are requested
+    until a page is not full.
+    """
+    data: List[List] = []
+    start = 0
+    with ThreadPoolExecutor(max_workers) as pool:
+        while True:
+            starts = range(start, start + max_workers * PAGE_SIZE, PAGE_SIZE)
+            pages = list(pool.map(listing_page, starts))
+            for page in pages:
+                data.extend(page)
+            if any(len(page) < PAGE_SIZE for page in pages):
+                break
+            start += max_workers * PAGE_SIZE
+    df = pd.DataFrame(data, columns=LISTING_COLUMNS)
+    return df.drop_duplicates("secid").reset_index(drop=True)
+
+
+def download_types() -> pd.DataFrame:
+    """Security type names (as in listing `type`) and their titles."""
+    param = {
+        "iss.only": "securitytypes",
+        "securitytypes.columns": "security_type_name,security_type_title",
+    }
+    block = get_compact("/iss/index", param)["securitytypes"]
+    df = pd.DataFrame(block["data"], columns=["type", "type_title"])
+    return df.drop_duplicates("type")
+
+
+def add_type_titles(listing: pd.DataFrame, types: pd.DataFrame) -> pd.DataFrame:
+    return listing.merge(types, how="left", on="type")
+
+
+def board_secids(b: Board) -> List[str]:
+    try:
+        return b.securities(columns=["SECID"])["SECID"].astype(str).tolist()
+    except (ISSMoexError, KeyError):
+        return []
+
+
+def download_boards(max_workers: int = MAX_WORKERS) -> pd.DataFrame:
+    """Security to traded board table from all traded boards."""
+    from finec.scan import discover_boards
+
+    boards = discover_boards(max_workers)
+    with ThreadPoolExecutor(max_workers) as pool:
+        secids = list(pool.map(board_secids, boards))
+    rows = [
+        (s, b.engine, b.market, b.board) for b, ss in zip(boards, secids) for s in ss
+    ]
+    return pd.DataFrame(rows, columns=["secid", "engine", "market", "boardid"])
+
+
+@dataclass
+class SecurityMaster:
+    securities: pd.DataFrame
+    boards: pd.DataFrame
+
+    def __post_init__(self):
+        self.securities = self.securities.reset_index(drop=True)
+        self.index: Dict[str, Dict[str, int]] = {key: {} for key in KEYS}
+        for key in KEYS:
+            for i, value in enumerate(self.securities[key]):
+                if isinstance(value, str):
+                    self.index[key].setdefault(value, i)
+        # boards sorted by secid, positions of each secid found by bisection
+        self.boards = self.boards.sort_values("secid", kind="stable").reset_index(
+            drop=True
+        )
+        self._board_secids = self.boards["secid"].to_numpy(dtype=str)
+
+    def position(self, key: str) -> Optional[int]:
+        for name in KEYS:
+            i = self.index[name].get(key)
+            if i is not None:
+                return i
+        return None
+
+    def describe(self, key: str) -> Dict:
+        """Listing row for SECID, ISIN or REGNUMBER *key*."""
+        i = self.position(key)
+        if i is None:
+            raise KeyError(key)
+        return self.securities.iloc[i].to_dict()
+
+    def __contains__(self, key: str) -> bool:
+        return self.position(key) is not None
+
+    def traded_boards(self, secid: str) -> List[str]:
+        i = np.searchsorted(self._board_secids, secid, side="left")
+        j = np.searchsorted(self._board_secids, secid, side="right")
+        return self.boards["boardid"].iloc[i:j].tolist()
+
+    def enrich(self, df: pd.DataFrame, on: str = "SECID", columns=None) -> pd.DataFrame:
+        """Add listing *columns* (all by default) to *df* by SECID in column *on*."""
+        right = self.securities.set_index("secid")
+        if columns is not None:
+            right = right[columns]
+        return df.join(right, on=on, rsuffix="_master")
+
+    def save(self, directory=None):
+        directory = Path(directory or default_directory())
+        directory.mkdir(parents=True, exist_ok=True)
+        self.securities.to_parquet(directory / "securities.parquet", index=False)
+        self.boards.to_parquet(directory / "boards.parquet", index=False)
+
+    @classmethod
+    def load(cls, directory=None):
+        directory = Path(directory or default_directory())
+        return cls(
+            pd.read_parquet(directory / "securities.parquet"),
+            pd.read_parquet(directory / "boards.parquet"),
+        )
+
+
+def build_master(directory=None, max_workers: int = MAX_WORKERS) -> SecurityMaster:
+    """Download listing and board tables and save them locally."""
+    listing = add_type_titles(download_listing(max_workers), download_types())
+    m = SecurityMaster(listing, download_boards(max_workers))
+    m.save(directory)
+    _load_master.cache_clear()
+    return m
+
+
+@lru_cache(maxsize=4)
+def _load_master(directory: str, mtime: float) -> SecurityMaster:
+    return SecurityMaster.load(directory)
+
+
+def is_stale(path: Path, max_age: Optional[float]) -> bool:
+    if not path.exists():
+        return True
+    return max_age is not None and time.time() - path.stat().st_mtime > max_age
+
+
+def security_master(
+    directory=None, max_age: Optional[float] = MAX_AGE
+) -> SecurityMaster:
+    """Security master from local files, built if missing or older than
+    *max_age* seconds (use max_age=None to never rebuild saved files)."""
+    directory = Path(directory or default_directory())
+    path = directory / "securities.parquet"
+    if is_stale(path, max_age):
+        build_master(directory)
+    return _load_master(str(directory), path.stat().st_mtime)
@@ -23,15 +23,20 @@ Tell more about securities:
   find("Челябинский")
 """
 
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from typing import ClassVar, Dict, List, Optional, Union
 
 import pandas as pd
 import requests
 from apimoex import ISSClient
+from apimoex.client import ISSMoexError
 from pandas._libs.missing import NAType
 
-from finec.dividend import get_dividend
+from finec.cache import CachedISSClient
+from finec.client import CLIENT
 
 __all__ = [
     "find",
@@ -61,19 +66,18 @@ class Endpoint:
 
     @property
     def qualified(self):
-        return "https://iss.moex.com" + self.locator + ".json"
+        return qualified(self.locator)
 
     def get_with(self, func_name: str, param: Dict = {}):
-        with requests.Session() as session:
-            client = ISSClient(session, self.qualified, param)
-            caller = getattr(client, func_name)
-            return caller()
+        client = CachedISSClient(CLIENT.session, self.qualified, param)
+        caller = getattr(client, func_name)
+        return caller()
 
     def get(self, param: Dict = {}):
         return self.get_with("get", param)
 
     def get_all(self, param: Dict = {}):
-        return self.get_with("get_all", param)
+        return get_all(self.locator, param)
 
 
 #%%
@@ -90,22 +94,141 @@ def assert_endpoint(endpoint):
 
 
 def qualified(endpoint):
-    return "https://iss.moex.com" + endpoint + ".json"
+    return CLIENT.url(endpoint)
 
 
 def get(endpoint, param={}):
     assert_endpoint(endpoint)
-    with requests.Session() as session:
-        return ISSClient(session, qualified(endpoint), param).get()
+    return CachedISSClient(CLIENT.session, qualified(endpoint), param).get()
+
+
+MAX_WORKERS = 8
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+
+def page_pool() -> ThreadPoolExecutor:
+    """Executor shared by all paginated downloads, created on first use.
+
+    Pages of concurrent `get_all()` calls queue in the same *MAX_WORKERS*
+    threads instead of each call starting its own pool.
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ThreadPoolExecutor(MAX_WORKERS, thread_name_prefix="finec-pages")
+            _pool_pid = os.getpid()
+    return _pool
+
+
+class CompactISSClient(CachedISSClient):
+    """Client for compact ISS json, each block is {"columns": [...], "data": [[...]]}."""
+
+    def _make_query(self, start=None):
+        query = super()._make_query(start)
+        query["iss.json"] = "compact"
+        return query
+
+    def fetch(self, start=None):
+        with self._session.get(self._url, params=self._make_query(start)) as respond:
+            try:
+                respond.raise_for_status()
+            except requests.HTTPError as err:
+                raise ISSMoexError("Неверный url", respond.url) from err
+            return respond.json()
+
+
+def rows(block) -> List:
+    # Compact block is a dict with "data" rows, extended block is a list of dicts
+    return block["data"] if isinstance(block, dict) else block
+
+
+def read_cursor(data: Dict) -> Optional[Dict]:
+    block = data.get("history.cursor")
+    if not block:
+        return None
+    if isinstance(block, dict):
+        return dict(zip(block["columns"], block["data"][0]))
+    return block[0]
+
+
+def merge_pages(pages: List[Dict]) -> Dict:
+    all_data: Dict = {}
+    for data in pages:
+        data.pop("history.cursor", None)
+        for key, value in data.items():
+            if isinstance(value, dict):
+                block = all_data.setdefault(
+                    key, {"columns": value["columns"], "data": []}
+                )
+                block["data"].extend(value["data"])
+            else:
+                all_data.setdefault(key, []).extend(value)
+    return all_data
+
+
+def get_pages(client: ISSClient) -> Dict:
+    """Collect all blocks of a paginated response, same as `client.get_all()`.
+
+    If first response has `history.cursor` block, remaining pages are
+    requested concurrently in `page_pool()` and reassembled in order.
+    Responses without cursor are walked page by page until an empty block.
+    """
+    first = client.get()
+    cursor = read_cursor(first)
+    if cursor:
+        size = cursor["PAGESIZE"]
+        starts = range(cursor["INDEX"] + size, cursor["TOTAL"], size)
+        rest = list(page_pool().map(client.get, starts))
+        return merge_pages([first] + rest)
+    pages = [first]
+    start = 0
+    while pages[-1]:
+        # Key name may be any, as in apimoex
+        key = next(iter(pages[-1]))
+        block_size = len(rows(pages[-1][key]))
+        if not block_size:
+            break
+        start += block_size
+        pages.append(client.get(start))
+    return merge_pages(pages)
 
 
 def get_all(endpoint, param={}):
     assert_endpoint(endpoint)
-    with requests.Session() as session:
-        return ISSClient(session, qualified(endpoint), param).get_all()
+    client = CachedISSClient(CLIENT.session, qualified(endpoint), param)
+    return get_pages(client)
+
 
+def get_columns(endpoint, param={}) -> Dict:
+    """Same as `get_all()`, but blocks are column names and data rows."""
+    assert_endpoint(endpoint)
+    client = CompactISSClient(CLIENT.session, qualified(endpoint), param)
+    return get_pages(client)
+
+
+def get_compact(endpoint, param={}) -> Dict:
+    """Single response in compact format, no pagination."""
+    assert_endpoint(endpoint)
+    return CompactISSClient(CLIENT.session, qualified(endpoint), param).get()
+
+
+def find(query_str: str, is_traded=True, local=False):
+    """Securities with *query_str* in ticker, name, ISIN or emitent.
+
+    With *local* searches local security master (see `finec.search`)
+    without a limit on number of results. The master is downloaded on
+    first use, which takes many requests.
+    """
+    if local:
+        from finec.search import search
 
-def find(query_str: str, is_traded=True):
+        # same filter as is_trading parameter of remote request
+        df = search(query_str, is_traded=bool(is_traded), substring=True)
+        df = df.drop(columns="score").astype(object)
+        return df.where(df.notna(), None).to_dict("records")
     param = dict(q=query_str)
     param["is_trading"] = "1" if is_traded else "0"
     # Note: possibly limits output to 100 items regardless of get_all
@@ -142,18 +265,41 @@ def history_endpoint(engine, market, board="", ticker=""):
     return endpoint("/iss/history", engine, market, board, ticker)
 
 
-def dataframe(json_dict) -> pd.DataFrame:
-    df = pd.DataFrame(json_dict)
+CATEGORY_COLUMNS = ["BOARDID", "SECID"]
+DATE_COLUMNS = ["MATDATE", "OFFERDATE", "BUYBACKDATE"]
+
+
+def as_dates(values) -> pd.Series:
+    # Invalid dates like "0000-00-00" become NaT
+    return pd.to_datetime(values, errors="coerce", format="%Y-%m-%d")
+
+
+def typed(df: pd.DataFrame) -> pd.DataFrame:
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = as_dates(df[col])
     if "TRADEDATE" in df.columns:
-        df["TRADEDATE"] = pd.to_datetime(df["TRADEDATE"])
+        df["TRADEDATE"] = as_dates(df["TRADEDATE"])
         df = df.set_index("TRADEDATE")
-    date_cols = ["MATDATE", "OFFERDATE", "BUYBACKDATE"]
-    for col in date_cols:
-        if col in df.columns:
-            df[col] = df[col].map(as_date)
     return df
 
 
+def dataframe(json_dict) -> pd.DataFrame:
+    """Dataframe from list of dictionaries (extended ISS json)."""
+    return typed(pd.DataFrame(json_dict))
+
+
+def frame(block: Dict) -> pd.DataFrame:
+    """Dataframe from compact ISS block with "columns" and "data" arrays.
+
+    Same result as `dataframe()` without making a dictionary for each row.
+    """
+    return typed(pd.DataFrame(block["data"], columns=block["columns"]))
+
+
 def get_engines() -> Dict:
     return {d["name"]: d["title"] for d in get("/iss/engines/")["engines"]}
 
@@ -194,7 +340,7 @@ class Market(Engine):
 
     def volumes(self) -> pd.DataFrame:
         return (
-            self.history()[["BOARDID", "VALUE"]]
+            self.history(columns=["BOARDID", "VALUE"])
             .groupby("BOARDID")
             .sum()
             .divide(1e6)
@@ -206,34 +352,50 @@ class Market(Engine):
     def board(self, board: str):
         return Board(self.engine, self.market, board)
 
-    def securities(self) -> pd.DataFrame:
+    def securities_block(self, block: str, columns=[]) -> pd.DataFrame:
         # /securities endpoint returns dict with following keys:
         # ['securities', 'marketdata', 'dataversion', 'marketdata_yields']
-        # - 'securities' is returned by this method
-        # - 'marketdata' is not meaningful data
+        # - 'securities' is returned by securities()
+        # - 'marketdata' is live quotes, polled by finec.poller
         # - 'dataversion' is a timestamp
-        # - 'marketdata_yields' is non-empty for bonds- returned by yields
-        return dataframe(get(self.endpoint + "/securities")["securities"])
+        # - 'marketdata_yields' is non-empty for bonds- returned by yields()
+        # Not paginated (no cursor, server may ignore start), one request
+        param = make_query_dict(columns, "", "", block)
+        param["iss.only"] = block
+        return frame(get_compact(self.endpoint + "/securities", param)[block])
+
+    def securities(self, columns=[]) -> pd.DataFrame:
+        return self.securities_block("securities", columns)
 
     def tickers(self) -> List[str]:
-        return self.securities()["SECID"].unique().tolist()
+        return self.securities(columns=["SECID"])["SECID"].unique().tolist()
 
-    def yields(self) -> pd.DataFrame:
-        return dataframe(get(self.endpoint + "/securities")["marketdata_yields"])
+    def yields(self, columns=[]) -> pd.DataFrame:
+        return self.securities_block("marketdata_yields", columns)
 
     @property
     def history_endpoint(self):
         return f"/iss/history/engines/{self.engine}/markets/{self.market}"
 
-    def history_json(self) -> List:
-        return get_all(self.history_endpoint + "/securities")["history"]
+    def history_param(self, columns=[], date="") -> Dict:
+        param = make_query_dict(columns, "", "")
+        if date:
+            param["date"] = assert_date(date)
+        return param
+
+    def history_json(self, columns=[], date="") -> List:
+        """Quotes for all securities on *date*, last trading day by default."""
+        param = self.history_param(columns, date)
+        return get_all(self.history_endpoint + "/securities", param)["history"]
 
-    def history(self) -> pd.DataFrame:
-        return dataframe(self.history_json())
+    def history(self, columns=[], date="") -> pd.DataFrame:
+        param = self.history_param(columns, date)
+        block = get_columns(self.history_endpoint + "/securities", param)["history"]
+        return frame(block)
 
     def volume(self) -> Optional[int]:
         try:
-            return self.history()["VOLUME"].sum()
+            return self.history(columns=["VOLUME"])["VOLUME"].sum()
         except KeyError:
             return None
 
@@ -299,7 +461,7 @@ def stock_prices(b: Board):
     ]
     # fmt: on
     return (
-        b.history()
+        b.history(columns)
         .query("NUMTRADES > 0")[columns]
         .sort_values("VALUE", ascending=False)
     )
@@ -321,7 +483,7 @@ def bond_prices(b: Board) -> pd.DataFrame:
            'BUYBACKDATE', 'LASTTRADEDATE',
            'FACEVALUE', 'CURRENCYID', 'FACEUNIT']
     # fmt: on
-    return b.history().query("NUMTRADES>0")[columns]
+    return b.history(columns).query("NUMTRADES>0")[columns]
 
 
 def bond_yields(b: Board) -> pd.DataFrame:
@@ -344,10 +506,10 @@ def securities(endpoint: str):
     return get(endpoint + "/securities")
 
 
-def make_query_dict(columns, start, end):
+def make_query_dict(columns, start, end, block="history"):
     param = {}
     if columns:
-        param["history.columns"] = ",".join(columns)
+        param[f"{block}.columns"] = ",".join(columns)
     if start:
         param["from"] = assert_date(start)
     if end:
@@ -361,6 +523,56 @@ def quote(b: Board, ticker: str, columns=[], start="", end=""):
     return get_all(endpoint, param)["history"]
 
 
+CANDLE_INTERVALS = {
+    1: "1 minute",
+    10: "10 minutes",
+    60: "1 hour",
+    24: "1 day",
+    7: "1 week",
+    31: "1 month",
+    4: "1 quarter",
+}
+
+
+def candles_endpoint(engine, market, board, ticker):
+    return endpoint("/iss", engine, market, board, ticker) + "/candles"
+
+
+def candles_frame(json_dict, compact=False) -> pd.DataFrame:
+    df = pd.DataFrame(json_dict)
+    for col in ["begin", "end"]:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col])
+    if compact:
+        for col in ["open", "close", "high", "low"]:
+            if col in df.columns:
+                df[col] = df[col].astype("float32")
+        if "volume" in df.columns:
+            # nullable integers if some volumes are missing
+            dtype = "Int64" if df["volume"].isna().any() else "int64"
+            df["volume"] = df["volume"].astype(dtype)
+    return df
+
+
+def iter_candles(b: Board, ticker: str, interval=24, columns=[], start="", end=""):
+    """Yield candles page by page, each page is a list of dictionaries."""
+    if interval not in CANDLE_INTERVALS:
+        raise ValueError(
+            f"interval must be one of {list(CANDLE_INTERVALS)}, got {interval}."
+        )
+    param = make_query_dict(columns, start, end, block="candles")
+    param["interval"] = interval
+    url = qualified(candles_endpoint(b.engine, b.market, b.board, ticker))
+    client = CachedISSClient(CLIENT.session, url, param)
+    position = 0
+    while True:
+        batch = client.get(position)["candles"]
+        if not batch:
+            return
+        yield batch
+        position += len(batch)
+
+
 def default(value):
     return field(repr=False, default=value)
 
@@ -398,12 +610,50 @@ class Security:
         return quote(self.board_obj, self.ticker, columns, start, end)
 
     def get_history(self, columns=[], start="", end=""):
-        return dataframe(self.get_history_json(columns, start, end))
+        if columns == []:
+            columns = self.default_columns
+        param = make_query_dict(columns, start, end)
+        return frame(get_columns(self.history_endpoint, param)["history"])
 
-    def get_candles(self, interval=24, columns=[], start="", end=""):
-        # "https://iss.moex.com/iss/engines/{engine}/markets/{market}/"
-        # f"boards/{board}/securities/{security}/candles.json"
-        pass
+    async def aget_history_json(self, columns=[], start="", end="", iss=None):
+        """Same as `get_history_json()`, pass shared `finec.aio.AsyncISS` as *iss*
+        to keep many concurrent downloads under one concurrency and rate limit.
+        """
+        from finec.aio import async_quote, async_quote_json_many
+
+        if columns == []:
+            columns = self.default_columns
+        if iss is not None:
+            return await async_quote(
+                iss, self.board_obj, self.ticker, columns, start, end
+            )
+        jsons = await async_quote_json_many(
+            self.board_obj, [self.ticker], columns, start, end
+        )
+        return jsons[self.ticker]
+
+    async def aget_history(self, columns=[], start="", end="", iss=None):
+        return dataframe(await self.aget_history_json(columns, start, end, iss))
+
+    def iter_candles(self, interval=24, columns=[], start="", end="", compact=False):
+        """Yield candles as dataframes, one per downloaded page."""
+        for batch in iter_candles(
+            self.board_obj, self.ticker, interval, columns, start, end
+        ):
+            yield candles_frame(batch, compact)
+
+    def get_candles(self, interval=24, columns=[], start="", end="", compact=False):
+        """Candles for *interval* (1, 10, 60 minutes, 24 - day, 7 - week,
+        31 - month, 4 - quarter) as dataframe indexed by candle start.
+
+        With *compact* prices are float32 (about 7 significant digits) and
+        volume is int64, to save memory on long minute histories.
+        """
+        frames = list(self.iter_candles(interval, columns, start, end, compact))
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True)
+        return df.set_index("begin") if "begin" in df.columns else df
 
 
 @dataclass
@@ -424,6 +674,9 @@ class Stock(Security):
     ]
 
     def get_dividend(self):
+        # Dividend table is read or downloaded on first call only
+        from finec.dividend import get_dividend
+
         return get_dividend(self.ticker)
 
 
@@ -473,6 +726,15 @@ class Bond(Security):
         "CURRENCYID",
     ]
 
+    def cashflows(self) -> pd.DataFrame:
+        """Coupons, amortizations and redemption from bondization schedule.
+
+        Value is NaN for coupons not announced yet.
+        """
+        from finec.bondization import bondization
+
+        return bondization(self.ticker).cashflows
+
 
 @dataclass
 class Index(Security):
@@ -482,15 +744,17 @@ class Index(Security):
     market: str = default("index")
     default_columns: ClassList = None
 
-    def composition(self):
+    def composition(self, date: str = ""):
         """
         Implemented as in https://github.com/WLM1ke/apimoex/issues/12
         See https://www.moex.com/ru/index/IMOEX/constituents/
+        Use *date* for composition and weights on past date.
         """
         endpoint = (
             f"/iss/statistics/engines/stock/markets/index/analytics/{self.ticker}"
         )
-        return get_all(endpoint)["analytics"]
+        param = {"date": assert_date(date)} if date else {}
+        return get_all(endpoint, param)["analytics"]
 
     def tickers(self):
         return [d["ticker"] for d in self.composition()]
@@ -557,16 +821,26 @@ def as_date(s: str) -> Union[pd.Timestamp, NAType]:
 
 
 def yield_jsons_by_field(security_class, tickers, field):
-    import tqdm
+    from finec.aio import loop_is_running, quote_json_many
 
+    tickers = list(tickers)
+    if not tickers:
+        return
     columns = ["TRADEDATE", "SECID", field]
-    for t in tqdm.tqdm(tickers):
-        for j in security_class(t).get_history_json(columns):
+    if loop_is_running():
+        # asyncio.run() is not allowed here (Jupyter, Colab), download one by one
+        jsons = {t: security_class(t).get_history_json(columns) for t in tickers}
+    else:
+        board = security_class(tickers[0]).board_obj
+        jsons = quote_json_many(board, tickers, columns)
+    for t in tickers:
+        for j in jsons[t]:
             if j[field]:
                 yield j
 
 
 def save_tickers(path, security_class, tickers, field):
-    gen = yield_jsons_by_field(security_class, tickers, field="CLOSE")
-    df = pd.DataFrame(gen).pivot(index="TRADEDATE", columns="SECID", values=field)
-    df.to_csv(path)
+    from finec.panel import build_panel
+
+    panel = build_panel(security_class, tickers, [field])
+    panel.to_frame(field).to_csv(path)
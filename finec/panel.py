@@ -0,0 +1,161 @@
+"""finec.panel - Wide dates x tickers panels for many securities.
+
+Each ticker history is requested with only TRADEDATE and selected fields
+and written straight into preallocated float64 arrays, one array per field,
+aligned on a shared calendar. No long intermediate dataframe is built.
+
+  from finec.moex import Index, Stock
+  from finec.panel import build_panel
+
+  panel = build_panel(Stock, Index("IMOEX").tickers(), ["CLOSE", "VOLUME"])
+  panel.to_frame("CLOSE").to_csv("datasets/IMOEX_CLOSE.csv")
+
+For large universes pass `directory=` to keep arrays in memory-mapped
+.npy files instead of RAM, and `Panel.load(directory)` to open them later.
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from finec.moex import MAX_WORKERS, get_columns, make_query_dict
+from finec.trading_calendar import TradingCalendar, as_days
+
+__all__ = ["Panel", "build_panel", "fetch_series"]
+
+Series = Tuple[np.ndarray, Dict[str, np.ndarray]]
+
+
+def fetch_series(security, fields: List[str], start="", end="") -> Series:
+    """Trading dates and float arrays of *fields* for one *security*.
+
+    Rows without any of the *fields* are skipped.
+    """
+    param = make_query_dict(["TRADEDATE"] + fields, start, end)
+    block = get_columns(security.history_endpoint, param)["history"]
+    columns, data = block["columns"], block["data"]
+    if not data:
+        return as_days([]), {f: np.empty(0) for f in fields}
+    rows = list(zip(*data))
+    values = {f: np.array(rows[columns.index(f)], dtype=float) for f in fields}
+    has_value = np.any([~np.isnan(v) for v in values.values()], axis=0)
+    dates = as_days(rows[columns.index("TRADEDATE")])[has_value]
+    return dates, {f: v[has_value] for f, v in values.items()}
+
+
+def empty_array(shape, path: Optional[Path] = None) -> np.ndarray:
+    if path is None:
+        return np.full(shape, np.nan)
+    arr = np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=shape)
+    arr[:] = np.nan
+    return arr
+
+
+@dataclass
+class Panel:
+    dates: np.ndarray
+    tickers: List[str]
+    values: Dict[str, np.ndarray]
+
+    @classmethod
+    def allocate(cls, dates, tickers, fields, directory=None):
+        """Panel filled with NaN, kept in .npy files under *directory* if given."""
+        dates, tickers = as_days(dates), list(tickers)
+        shape = (len(dates), len(tickers))
+        if directory is not None:
+            directory = Path(directory)
+            directory.mkdir(parents=True, exist_ok=True)
+            np.save(directory / "dates.npy", dates)
+            (directory / "tickers.json").write_text(json.dumps(tickers))
+        values = {}
+        for f in fields:
+            path = None if directory is None else directory / f"{f}.npy"
+            values[f] = empty_array(shape, path)
+        return cls(dates, tickers, values)
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r"):
+        directory = Path(directory)
+        dates = np.load(directory / "dates.npy")
+        tickers = json.loads((directory / "tickers.json").read_text())
+        values = {
+            p.stem: np.load(p, mmap_mode=mmap_mode)
+            for p in sorted(directory.glob("*.npy"))
+            if p.stem != "dates"
+        }
+        return cls(dates, tickers, values)
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self.values.keys())
+
+    def put(self, ticker: str, dates: np.ndarray, values: Dict[str, np.ndarray]):
+        """Write series of *ticker*, dates outside calendar are ignored."""
+        if not len(self.dates):
+            return
+        col = self.tickers.index(ticker)
+        rows = np.minimum(self.dates.searchsorted(dates), len(self.dates) - 1)
+        on_calendar = self.dates[rows] == dates
+        for field, arr in values.items():
+            self.values[field][rows[on_calendar], col] = arr[on_calendar]
+
+    def flush(self):
+        for arr in self.values.values():
+            if isinstance(arr, np.memmap):
+                arr.flush()
+
+    def to_frame(self, field: str) -> pd.DataFrame:
+        index = pd.DatetimeIndex(self.dates, name="TRADEDATE")
+        return pd.DataFrame(self.values[field], index=index, columns=self.tickers)
+
+    def to_parquet(self, directory):
+        """Save one dates x tickers Parquet file per field."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for field in self.fields:
+            self.to_frame(field).to_parquet(directory / f"{field}.parquet")
+
+
+def build_panel(
+    security_class,
+    tickers: Iterable[str],
+    fields: List[str] = ["CLOSE"],
+    start="",
+    end="",
+    calendar=None,
+    directory=None,
+    max_workers: int = MAX_WORKERS,
+) -> Panel:
+    """Download *fields* for *tickers* concurrently into a `Panel`.
+
+    With *calendar* (`TradingCalendar` or sequence of dates) each series is
+    written as soon as it arrives. Otherwise calendar is the union of dates
+    with any value.
+    """
+    tickers = list(tickers)
+    if isinstance(calendar, TradingCalendar):
+        calendar = calendar.between(start, end)
+
+    def fetch(ticker):
+        return fetch_series(security_class(ticker), fields, start, end)
+
+    with ThreadPoolExecutor(max_workers) as pool:
+        futures = {pool.submit(fetch, t): t for t in tickers}
+        if calendar is not None:
+            panel = Panel.allocate(calendar, tickers, fields, directory)
+            for future in as_completed(futures):
+                panel.put(futures[future], *future.result())
+        else:
+            series = {futures[f]: f.result() for f in as_completed(futures)}
+            all_dates = [as_days([])] + [d for d, _ in series.values()]
+            dates = np.unique(np.concatenate(all_dates))
+            panel = Panel.allocate(dates, tickers, fields, directory)
+            for ticker, (dates, values) in series.items():
+                panel.put(ticker, dates, values)
+    panel.flush()
+    return panel
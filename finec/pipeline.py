@@ -0,0 +1,269 @@
+"""finec.pipeline - Dataset builds with dependencies, parallel stages and checkpoints.
+
+A dataset is a `Target`: a module-level function that returns a dataframe,
+names of targets whose results it takes as arguments, and a stage.
+Fetch targets run in a thread pool, transform targets in a process pool.
+Each result is written to CSV and Parquet in the output directory and
+recorded in `checkpoint.json` under a build id (today's date by default),
+so an interrupted build resumes with the targets that are not done yet,
+while a run with a new build id, such as next night's, builds everything.
+
+  from finec.pipeline import Pipeline, dividends, index_panel, total_return
+
+  Pipeline(
+      [
+          dividends("dividend"),
+          index_panel("IMOEX", "CLOSE"),
+          total_return("IMOEX_TR", close="IMOEX_CLOSE", dividends="dividend"),
+      ],
+      directory="datasets",
+  ).run()
+"""
+
+import json
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+import pandas as pd
+
+from finec.moex import Board, Index, Security, Stock
+
+__all__ = [
+    "Target",
+    "Pipeline",
+    "dividends",
+    "index_panel",
+    "board_panel",
+    "total_return",
+]
+
+FETCH = "fetch"
+TRANSFORM = "transform"
+FORMATS = ("csv", "parquet")
+
+
+@dataclass
+class Target:
+    name: str
+    func: Callable[..., pd.DataFrame]
+    deps: Sequence[str] = ()
+    stage: str = FETCH
+    index: bool = True
+
+
+def write(df: pd.DataFrame, path: Path, index: bool):
+    if path.suffix == ".csv":
+        df.to_csv(path, index=index)
+    else:
+        df.to_parquet(path, index=index)
+
+
+@dataclass
+class Pipeline:
+    targets: List[Target]
+    directory: Path = Path("datasets")
+    formats: Sequence[str] = FORMATS
+    fetch_workers: int = 4
+    transform_workers: int = 2
+    build: str = ""
+    by_name: Dict[str, Target] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.directory = Path(self.directory)
+        self.build = self.build or date.today().isoformat()
+        self.by_name = {t.name: t for t in self.targets}
+        for t in self.targets:
+            for dep in t.deps:
+                if dep not in self.by_name:
+                    raise KeyError(f"{t.name} depends on unknown target {dep}")
+
+    @property
+    def checkpoint_path(self) -> Path:
+        return self.directory / "checkpoint.json"
+
+    def read_checkpoint(self) -> Dict[str, Dict]:
+        """Targets done in current build, empty if checkpoint is from other build."""
+        if self.checkpoint_path.exists():
+            data = json.loads(self.checkpoint_path.read_text())
+            if data.get("build") == self.build:
+                return data.get("targets", {})
+        return {}
+
+    def paths(self, name: str) -> List[Path]:
+        return [self.directory / f"{name}.{fmt}" for fmt in self.formats]
+
+    def parquet_path(self, name: str) -> Path:
+        return self.directory / f"{name}.parquet"
+
+    def is_done(self, name: str, checkpoint: Dict) -> bool:
+        return name in checkpoint and all(p.exists() for p in self.paths(name))
+
+    def required(self, only: Optional[Iterable[str]]) -> List[str]:
+        """Names of *only* targets and their dependencies, all by default."""
+        if only is None:
+            return [t.name for t in self.targets]
+        names: List[str] = []
+
+        def visit(name):
+            if name not in names:
+                for dep in self.by_name[name].deps:
+                    visit(dep)
+                names.append(name)
+
+        for name in only:
+            visit(name)
+        return names
+
+    def dependents(self, names: Iterable[str]) -> Set[str]:
+        """*names* and all targets that depend on them directly or indirectly."""
+        found = set(names)
+        changed = True
+        while changed:
+            changed = False
+            for t in self.targets:
+                if t.name not in found and found.intersection(t.deps):
+                    found.add(t.name)
+                    changed = True
+        return found
+
+    def load(self, name: str) -> pd.DataFrame:
+        return pd.read_parquet(self.parquet_path(name))
+
+    def save(self, target: Target, df: pd.DataFrame, checkpoint: Dict):
+        for path in self.paths(target.name):
+            write(df, path, target.index)
+        checkpoint[target.name] = dict(
+            built=datetime.now().isoformat(timespec="seconds"), rows=len(df)
+        )
+        data = dict(build=self.build, targets=checkpoint)
+        self.checkpoint_path.write_text(json.dumps(data, indent=2))
+
+    def run(self, only: Optional[Iterable[str]] = None, force=False) -> Dict[str, Path]:
+        """Build targets not done yet in current build, return paths to Parquet files.
+
+        With *force* all required targets are rebuilt, and targets that
+        depend on them are dropped from checkpoint, so that next run rebuilds
+        them too. Other targets stay done. If a target fails,
+        targets already running are finished and saved before the error
+        is raised.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        checkpoint = self.read_checkpoint()
+        names = self.required(only)
+        if force:
+            for name in self.dependents(names):
+                checkpoint.pop(name, None)
+        done = {n for n in names if self.is_done(n, checkpoint)}
+        results: Dict[str, pd.DataFrame] = {}
+        pending: Dict[Future, str] = {}
+        pools: Dict[str, Executor] = {
+            FETCH: ThreadPoolExecutor(self.fetch_workers),
+            TRANSFORM: ProcessPoolExecutor(self.transform_workers),
+        }
+        try:
+            while len(done) < len(names):
+                for name in names:
+                    t = self.by_name[name]
+                    if name in done or name in pending.values():
+                        continue
+                    if all(dep in done for dep in t.deps):
+                        args = [self.result(dep, results) for dep in t.deps]
+                        pending[pools[t.stage].submit(t.func, *args)] = name
+                if not pending:
+                    raise ValueError("Targets have circular dependencies.")
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                errors = self.collect(finished, pending, results, checkpoint, done)
+                if errors:
+                    # keep results of running targets for the next run
+                    self.collect(wait(pending).done, pending, results, checkpoint, done)
+                    raise errors[0]
+        finally:
+            for pool in pools.values():
+                pool.shutdown()
+        return {name: self.parquet_path(name) for name in names}
+
+    def collect(
+        self, finished, pending, results, checkpoint, done
+    ) -> List[BaseException]:
+        """Save results of *finished* futures, return their errors."""
+        errors = []
+        for future in finished:
+            name = pending.pop(future)
+            error = future.exception()
+            if error is not None:
+                errors.append(error)
+                continue
+            results[name] = future.result()
+            self.save(self.by_name[name], results[name], checkpoint)
+            done.add(name)
+        return errors
+
+    def result(self, name: str, results: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        if name not in results:
+            results[name] = self.load(name)
+        return results[name]
+
+
+# Targets used for datasets/ folder
+
+
+def fetch_dividends() -> pd.DataFrame:
+    from finec.dividend import get_dividend_all, refresh_dividends
+
+    refresh_dividends()
+    return get_dividend_all()
+
+
+def fetch_panel(security_class, tickers: List[str], field: str, start="", end=""):
+    from finec.panel import build_panel
+
+    return build_panel(security_class, tickers, [field], start, end).to_frame(field)
+
+
+def fetch_index_panel(index: str, field: str, start="", end="") -> pd.DataFrame:
+    return fetch_panel(Stock, Index(index).tickers(), field, start, end)
+
+
+def fetch_board_panel(board: Board, field: str, start="", end="") -> pd.DataFrame:
+    security_class = partial(
+        Security, board=board.board, engine=board.engine, market=board.market
+    )
+    tickers = board.securities(columns=["SECID"])["SECID"].astype(str).tolist()
+    return fetch_panel(security_class, tickers, field, start, end)
+
+
+def total_return_frame(close: pd.DataFrame, dividends: pd.DataFrame) -> pd.DataFrame:
+    from finec.total_return import total_return_index
+
+    return total_return_index(close, dividends, base=100)
+
+
+def dividends(name: str = "dividend") -> Target:
+    return Target(name, fetch_dividends, index=False)
+
+
+def index_panel(index: str, field: str = "CLOSE", start="", end="") -> Target:
+    """Dates x tickers *field* for current members of *index*."""
+    func = partial(fetch_index_panel, index, field, start, end)
+    return Target(f"{index}_{field}", func)
+
+
+def board_panel(board: Board, field: str = "CLOSE", start="", end="") -> Target:
+    """Dates x tickers *field* for all securities of *board*."""
+    func = partial(fetch_board_panel, board, field, start, end)
+    return Target(f"{board.board}_{field}", func)
+
+
+def total_return(name: str, close: str, dividends: str) -> Target:
+    return Target(name, total_return_frame, deps=(close, dividends), stage=TRANSFORM)
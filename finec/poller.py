@@ -0,0 +1,124 @@
+"""finec.poller - Live quotes for a whole board, emitting only changed rows.
+
+Each tick requests `marketdata` and `dataversion` blocks of board securities
+in compact format, bypassing the response cache. A tick with the same
+data version and SEQNUM as before is skipped without parsing rows.
+Otherwise numeric columns are read into a float64 array and compared
+with the previous snapshot, and only changed securities are emitted.
+
+  from finec.moex import stocks_board
+  from finec.poller import MarketdataPoller
+
+  poller = MarketdataPoller(stocks_board(), interval=0.5)
+  poller.run(print)
+
+  async for df in poller.changes():
+      ...
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from finec.cache import ResponseCache
+from finec.client import CLIENT
+from finec.moex import Board, CompactISSClient
+
+__all__ = ["Snapshot", "MarketdataPoller"]
+
+DEFAULT_COLUMNS = ["LAST", "BID", "OFFER", "NUMTRADES", "VOLTODAY", "VALTODAY", "SEQNUM"]
+
+NO_CACHE = ResponseCache(enabled=False)
+
+
+@dataclass
+class Snapshot:
+    """Numeric marketdata columns of a board, one row per security."""
+
+    secids: pd.Index
+    columns: List[str]
+    values: np.ndarray
+
+    @classmethod
+    def from_block(cls, block: Dict, columns: List[str]):
+        index = {name: i for i, name in enumerate(block["columns"])}
+        data = block["data"]
+        secid = index["SECID"]
+        values = np.full((len(data), len(columns)), np.nan)
+        for j, name in enumerate(columns):
+            if name in index:
+                i = index[name]
+                values[:, j] = np.array([row[i] for row in data], dtype=float)
+        return cls(pd.Index([row[secid] for row in data]), columns, values)
+
+    def changed(self, previous: Optional["Snapshot"]) -> np.ndarray:
+        """Boolean mask of rows that are new or differ from *previous*."""
+        if previous is None or not len(previous.secids):
+            return np.ones(len(self.secids), dtype=bool)
+        rows = previous.secids.get_indexer(self.secids)
+        old = np.where(rows[:, None] >= 0, previous.values[rows], np.nan)
+        same = (old == self.values) | (np.isnan(old) & np.isnan(self.values))
+        return (rows < 0) | ~same.all(axis=1)
+
+    def to_frame(self, mask=None) -> pd.DataFrame:
+        mask = slice(None) if mask is None else mask
+        df = pd.DataFrame(self.values[mask], columns=self.columns)
+        df.insert(0, "SECID", self.secids[mask])
+        return df
+
+
+def version_of(data: Dict):
+    block = data.get("dataversion") or {"columns": [], "data": []}
+    return tuple(block["data"][0]) if block["data"] else None
+
+
+@dataclass
+class MarketdataPoller:
+    board: Board
+    columns: List[str] = field(default_factory=lambda: list(DEFAULT_COLUMNS))
+    interval: float = 1.0
+
+    def __post_init__(self):
+        self.snapshot: Optional[Snapshot] = None
+        self.version = None
+        param = {"iss.only": "marketdata,dataversion"}
+        url = CLIENT.url(self.board.endpoint + "/securities")
+        self.client = CompactISSClient(CLIENT.session, url, param, cache=NO_CACHE)
+
+    def poll(self) -> Optional[pd.DataFrame]:
+        """One request, changed rows or None if data version did not change."""
+        data = self.client.get()
+        version = version_of(data)
+        if version is not None and version == self.version:
+            return None
+        snapshot = Snapshot.from_block(data["marketdata"], self.columns)
+        mask = snapshot.changed(self.snapshot)
+        self.snapshot, self.version = snapshot, version
+        return snapshot.to_frame(mask)
+
+    def run(self, callback: Callable[[pd.DataFrame], None], ticks: Optional[int] = None):
+        """Call *callback* with changed rows every *interval* seconds."""
+        n = 0
+        while True:
+            started = time.monotonic()
+            df = self.poll()
+            if df is not None and len(df):
+                callback(df)
+            n += 1
+            if ticks is not None and n >= ticks:
+                break
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    async def changes(self):
+        """Asynchronous iterator over frames of changed rows."""
+        loop = asyncio.get_event_loop()
+        while True:
+            started = loop.time()
+            df = await loop.run_in_executor(None, self.poll)
+            if df is not None and len(df):
+                yield df
+            await asyncio.sleep(max(0.0, self.interval - (loop.time() - started)))
@@ -0,0 +1,145 @@
+"""finec.replication - Index composition history and index replication.
+
+Index weights on past dates come from
+`/iss/statistics/engines/stock/markets/index/analytics/{index}?date=`,
+requested concurrently and cached on disk forever for closed dates.
+They are kept as a dates x tickers weight matrix. Between composition
+dates weights drift with prices, and the replicated index level for all
+days is computed from a CLOSE panel in one matrix operation.
+
+  from finec.replication import composition_history, replicate
+
+  weights = composition_history("IMOEX", start="2022-01-01", freq="MS")
+  replicate(close, weights, index_close=Index("IMOEX").get_history()["CLOSE"])
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from finec.moex import MAX_WORKERS, assert_date, get_columns
+
+__all__ = [
+    "composition_history",
+    "weight_matrix",
+    "drifted_weights",
+    "index_returns",
+    "replicate",
+    "tracking_error",
+]
+
+TRADING_DAYS = 252
+
+
+def analytics_endpoint(index: str) -> str:
+    return f"/iss/statistics/engines/stock/markets/index/analytics/{index}"
+
+
+def composition_rows(index: str, date: str) -> List[Dict]:
+    """Tickers and weights of *index* on *date*, weights are fractions."""
+    param = {"date": assert_date(date), "analytics.columns": "tradedate,ticker,weight"}
+    block = get_columns(analytics_endpoint(index), param)["analytics"]
+    cols = block["columns"]
+    return [dict(zip(cols, row)) for row in block["data"]]
+
+
+def weight_matrix(rows: List[Dict]) -> pd.DataFrame:
+    """Dates x tickers weights from composition rows, 0 for non-members."""
+    df = pd.DataFrame(rows, columns=["tradedate", "ticker", "weight"])
+    dates, date_codes = np.unique(df["tradedate"].astype(str), return_inverse=True)
+    tickers, ticker_codes = np.unique(df["ticker"].astype(str), return_inverse=True)
+    W = np.zeros((len(dates), len(tickers)))
+    W[date_codes, ticker_codes] = df["weight"].to_numpy(dtype=float) / 100
+    index = pd.DatetimeIndex(dates.astype("datetime64[D]"), name="TRADEDATE")
+    return pd.DataFrame(W, index=index, columns=tickers)
+
+
+def composition_history(
+    index: str = "IMOEX",
+    dates: Optional[List[str]] = None,
+    start: str = "",
+    end: str = "",
+    freq: str = "MS",
+    max_workers: int = MAX_WORKERS,
+) -> pd.DataFrame:
+    """Weight matrix of *index* on *dates*, requested concurrently.
+
+    Without *dates*, uses pandas frequency *freq* from *start* to *end*
+    (month starts by default, *start* is required, *end* is today by default).
+    Dates that resolve to the same published composition give one row.
+    """
+    if dates is None:
+        if not start:
+            raise ValueError("start is required when dates are not given.")
+        end = end or pd.Timestamp.today().strftime("%Y-%m-%d")
+        dates = pd.date_range(start, end, freq=freq).strftime("%Y-%m-%d").tolist()
+    with ThreadPoolExecutor(max_workers) as pool:
+        pages = pool.map(lambda d: composition_rows(index, d), dates)
+        rows = [row for page in pages for row in page]
+    return weight_matrix(rows)
+
+
+def drifted_weights(close: pd.DataFrame, weights: pd.DataFrame) -> np.ndarray:
+    """Weights for every day of *close*, drifting with prices between rebalances.
+
+    w[t] is proportional to W[s] * P[t] / P[s], where s is the last
+    composition date on or before t. Rows before first composition are NaN.
+    """
+    W = weights.reindex(columns=close.columns, fill_value=0).to_numpy(dtype=float)
+    P = close.ffill().to_numpy(dtype=float)
+    # first day of close on or after each composition date
+    days = close.index.searchsorted(weights.index)
+    keep = days < len(close)
+    # composition row in effect and the day it took effect, for each day
+    row = np.full(len(close), -1)
+    row[days[keep]] = np.flatnonzero(keep)
+    row = np.maximum.accumulate(row)
+    anchor = np.full(len(close), -1)
+    anchor[days[keep]] = days[keep]
+    anchor = np.maximum.accumulate(anchor)
+    has = row >= 0
+    out = np.full(P.shape, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        drift = W[row[has]] * P[has] / P[anchor[has]]
+        drift = np.where(np.isfinite(drift), drift, 0)
+        out[has] = drift / drift.sum(axis=1, keepdims=True)
+    return out
+
+
+def index_returns(close: pd.DataFrame, weights: pd.DataFrame) -> pd.Series:
+    """Daily returns of portfolio held with previous day drifted weights."""
+    w = drifted_weights(close, weights)
+    P = close.ffill().to_numpy(dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        R = P[1:] / P[:-1] - 1
+    R = np.where(np.isfinite(R), R, 0)
+    r = np.einsum("ij,ij->i", w[:-1], R)
+    return pd.Series(np.r_[np.nan, r], index=close.index, name="RETURN")
+
+
+def tracking_error(returns: pd.Series, benchmark: pd.Series, periods=TRADING_DAYS):
+    """Annualized standard deviation of return differences."""
+    diff = (returns - benchmark).dropna()
+    return float(diff.std() * np.sqrt(periods))
+
+
+def replicate(close: pd.DataFrame, weights: pd.DataFrame, index_close=None):
+    """Replicated index level rebased to *index_close* and tracking error.
+
+    Returns dataframe with LEVEL (and INDEX) columns and tracking error
+    (None without *index_close*).
+    """
+    r = index_returns(close, weights)
+    valid = r.notna()
+    started = valid | valid.shift(-1, fill_value=False)
+    level = (1 + r.where(valid, 0)).cumprod().where(started)
+    df = pd.DataFrame({"LEVEL": level})
+    if index_close is None:
+        return df, None
+    benchmark = index_close.reindex(close.index).ffill()
+    first = level.first_valid_index()
+    df["LEVEL"] = level * benchmark[first] / level[first]
+    df["INDEX"] = benchmark
+    return df, tracking_error(r, benchmark.pct_change())
@@ -0,0 +1,75 @@
+"""finec.scan - Trading turnover for all boards of the exchange.
+
+Discovers engines, markets and traded boards concurrently and requests
+only BOARDID, VOLUME and VALUE columns of last day history per board.
+
+  from finec.scan import scan_boards
+
+  scan_boards()  # engine, market, board, volume, value
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import pandas as pd
+from apimoex.client import ISSMoexError
+
+from finec.moex import Board, Engine, Market, get_engines
+
+__all__ = ["discover_boards", "board_turnover", "scan_boards"]
+
+MAX_WORKERS = 8
+TURNOVER_COLUMNS = ["BOARDID", "VOLUME", "VALUE"]
+
+
+def market_names(engine: str) -> List[str]:
+    try:
+        return list(Engine(engine).markets())
+    except ISSMoexError:
+        return []
+
+
+def traded_boards(engine: str, market: str) -> List[Board]:
+    try:
+        return [Board(engine, market, b) for b in Market(engine, market).traded_boards()]
+    except (ISSMoexError, KeyError):
+        return []
+
+
+def discover_boards(max_workers: int = MAX_WORKERS) -> List[Board]:
+    """All traded boards of all engines and markets."""
+    engines = list(get_engines())
+    with ThreadPoolExecutor(max_workers) as pool:
+        markets = pool.map(market_names, engines)
+        pairs = [(e, m) for e, ms in zip(engines, markets) for m in ms]
+        boards = pool.map(lambda pair: traded_boards(*pair), pairs)
+        return [b for bs in boards for b in bs]
+
+
+def board_turnover(b: Board) -> Optional[Dict]:
+    """Sum of VOLUME and VALUE over last day history of board *b*."""
+    try:
+        df = b.history(columns=TURNOVER_COLUMNS)
+    except (ISSMoexError, KeyError):
+        return None
+    return dict(
+        engine=b.engine,
+        market=b.market,
+        board=b.board,
+        volume=df["VOLUME"].sum() if "VOLUME" in df.columns else None,
+        value=df["VALUE"].sum() if "VALUE" in df.columns else None,
+    )
+
+
+def scan_boards(boards: Optional[List[Board]] = None, max_workers: int = MAX_WORKERS):
+    """Turnover table for *boards*, all traded boards by default.
+
+    Boards without history or without trades are left out.
+    """
+    if boards is None:
+        boards = discover_boards(max_workers)
+    with ThreadPoolExecutor(max_workers) as pool:
+        rows = [r for r in pool.map(board_turnover, boards) if r]
+    df = pd.DataFrame(rows, columns=["engine", "market", "board", "volume", "value"])
+    df = df[(df.volume.fillna(0) != 0) | (df.value.fillna(0) != 0)]
+    return df.sort_values("value", ascending=False).reset_index(drop=True)
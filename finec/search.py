@@ -0,0 +1,147 @@
+"""finec.search - Offline fuzzy search over all listed securities.
+
+Trigram index over SECID, short name, name, ISIN and emitent of the
+security master (`finec.master`), which is downloaded on first use and
+rebuilt when older than a week. Query trigrams are looked up in posting
+arrays and counted per security with `np.bincount`, so a query over the
+whole instrument universe takes milliseconds and has no result cap.
+
+  from finec.search import search
+
+  search("сбер")               # ranked dataframe
+  search("Челябинский", limit=10)
+"""
+
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from finec.master import MAX_AGE, SecurityMaster, default_directory, security_master
+
+__all__ = ["SearchIndex", "search"]
+
+FIELDS = ["secid", "shortname", "name", "isin", "emitent_title"]
+MIN_SHARE = 0.5
+EXACT_BONUS = [("secid", 1.0), ("isin", 1.0), ("shortname", 0.5)]
+
+TOKEN = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    return text.lower().replace("ё", "е")
+
+
+def tokens(text) -> List[str]:
+    return TOKEN.findall(normalize(text)) if isinstance(text, str) else []
+
+
+@lru_cache(maxsize=100_000)
+def word_trigrams(word: str) -> FrozenSet[str]:
+    """Trigrams of *word*, padded so that word start is matched."""
+    padded = "  " + word + " "
+    return frozenset(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+def trigrams(text) -> Set[str]:
+    return set().union(*(word_trigrams(word) for word in tokens(text)))
+
+
+@dataclass
+class SearchIndex:
+    securities: pd.DataFrame
+    postings: Dict[str, np.ndarray]
+    texts: List[str]
+
+    def __post_init__(self):
+        # lower case keys for exact match bonus
+        self.keys = {
+            col: self.securities[col].fillna("").astype(str).str.lower().to_numpy()
+            for col, _ in EXACT_BONUS
+        }
+
+    @classmethod
+    def from_frame(cls, securities: pd.DataFrame):
+        securities = securities.reset_index(drop=True)
+        lists = defaultdict(list)
+        texts = []
+        for i, row in enumerate(securities[FIELDS].astype(object).to_numpy()):
+            for gram in set().union(*(trigrams(t) for t in row)):
+                lists[gram].append(i)
+            texts.append(" ".join(normalize(t) for t in row if isinstance(t, str)))
+        postings = {g: np.array(rows, dtype=np.int32) for g, rows in lists.items()}
+        return cls(securities, postings, texts)
+
+    @classmethod
+    def from_master(cls, master: SecurityMaster):
+        return cls.from_frame(master.securities)
+
+    def scores(self, query: str) -> np.ndarray:
+        """Share of query trigrams found in each security, plus exact match bonus."""
+        grams = trigrams(query)
+        n = len(self.securities)
+        if not grams:
+            return np.zeros(n)
+        hits = [self.postings[g] for g in grams if g in self.postings]
+        rows = np.concatenate(hits) if hits else np.empty(0, dtype=np.int32)
+        score = np.bincount(rows, minlength=n) / len(grams)
+        q = normalize(query.strip())
+        for col, bonus in EXACT_BONUS:
+            score[self.keys[col] == q] += bonus
+        return score
+
+    def search(
+        self,
+        query: str,
+        limit: Optional[int] = None,
+        is_traded: Optional[bool] = None,
+        substring: bool = False,
+    ) -> pd.DataFrame:
+        """Securities matching at least half of *query* trigrams, best first.
+
+        With *substring* only securities with *query* in one of the fields
+        are kept, as in `/iss/securities?q=` search.
+        """
+        score = self.scores(query)
+        mask = score >= MIN_SHARE
+        if is_traded is not None:
+            mask &= (self.securities["is_traded"] == int(is_traded)).to_numpy()
+        rows = np.flatnonzero(mask)
+        if substring:
+            q = normalize(query.strip())
+            rows = np.array([i for i in rows if q in self.texts[i]], dtype=int)
+        traded = self.securities["is_traded"].fillna(0).to_numpy()[rows]
+        order = np.lexsort((-traded, -score[rows]))
+        rows = rows[order][:limit]
+        df = self.securities.iloc[rows].copy()
+        df["score"] = score[rows]
+        return df.reset_index(drop=True)
+
+
+@lru_cache(maxsize=4)
+def _load_index(directory: str, mtime: float) -> SearchIndex:
+    return SearchIndex.from_master(security_master(directory))
+
+
+def search_index(directory=None, max_age=MAX_AGE) -> SearchIndex:
+    directory = Path(directory or default_directory())
+    security_master(directory, max_age)  # builds or refreshes master
+    path = directory / "securities.parquet"
+    return _load_index(str(directory), path.stat().st_mtime)
+
+
+def search(
+    query: str,
+    limit=None,
+    is_traded=None,
+    substring=False,
+    directory=None,
+    max_age=MAX_AGE,
+):
+    """Search security master for *query*, see `SearchIndex.search()`."""
+    return search_index(directory, max_age).search(query, limit, is_traded, substring)
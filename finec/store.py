@@ -0,0 +1,146 @@
+"""finec.store - Local history store that downloads only missing trading days.
+
+Each security is kept in its own Parquet file under
+`local_directory() / "finec_history" / engine / market / board / ticker.parquet`.
+`update()` and `refresh()` request rows after the last stored TRADEDATE
+and append them. Reads download history only if nothing is stored or
+*end* is after the last stored date, unless `update_on_read` is set.
+With a trading calendar no request is made when there were no trading
+days since the last stored date.
+
+  from finec.moex import Bond, Stock
+  from finec.store import HistoryStore
+
+  store = HistoryStore(calendar=trading_calendar())
+  store.get_history(Stock("SBER"), start="2020-01-01")
+  store.refresh([Bond(t) for t in ["RU000A0JXN21", "RU000A101NJ6"]])
+  store.missing(Stock("SBER"))
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from finec.cache import moscow_today
+from finec.directory import local_directory
+from finec.moex import Security, dataframe, quote
+from finec.trading_calendar import TradingCalendar
+
+__all__ = ["HistoryStore"]
+
+
+def default_directory() -> Path:
+    return local_directory() / "finec_history"
+
+
+def next_day(iso_date: str) -> str:
+    return (date.fromisoformat(iso_date) + timedelta(days=1)).isoformat()
+
+
+def conform(new: pd.DataFrame, old: pd.DataFrame) -> pd.DataFrame:
+    """*new* rows with columns of *old* and, where values allow, its dtypes."""
+    new = new.reindex(columns=old.columns)
+    for col, dtype in old.dtypes.items():
+        try:
+            new[col] = new[col].astype(dtype)
+        except (TypeError, ValueError):
+            pass  # eg. missing values in integer column, concat makes floats
+    return new
+
+
+@dataclass
+class HistoryStore:
+    directory: Optional[Path] = None
+    max_workers: int = 8
+    calendar: Optional[TradingCalendar] = None
+    update_on_read: bool = False
+
+    def __post_init__(self):
+        self.directory = Path(self.directory or default_directory())
+
+    def path(self, security: Security) -> Path:
+        s = security
+        return self.directory / s.engine / s.market / s.board / f"{s.ticker}.parquet"
+
+    def read_raw(self, security: Security) -> pd.DataFrame:
+        """Stored rows as in ISS response, TRADEDATE is a string column."""
+        path = self.path(security)
+        if path.exists():
+            return pd.read_parquet(path)
+        return pd.DataFrame()
+
+    def last_date(self, security: Security) -> Optional[str]:
+        path = self.path(security)
+        if not path.exists():
+            return None
+        df = pd.read_parquet(path, columns=["TRADEDATE"])
+        return df["TRADEDATE"].max() if len(df) else None
+
+    def update(self, security: Security) -> int:
+        """Download rows after last stored date, return number of new rows."""
+        last = self.last_date(security)
+        start = next_day(last) if last else ""
+        if start and start > moscow_today():
+            return 0
+        if last and self.calendar is not None and not len(self.calendar.after(last)):
+            return 0
+        # quote() passes start as from= parameter via make_query_dict()
+        new_rows = quote(security.board_obj, security.ticker, None, start)
+        if not new_rows:
+            return 0
+        old = self.read_raw(security)
+        new = pd.DataFrame(new_rows)
+        if len(old.columns):
+            # stored schema wins if ISS adds or drops a column
+            new = conform(new, old)
+        df = pd.concat([old, new])
+        df = df.drop_duplicates(subset=["TRADEDATE"], keep="last")
+        path = self.path(security)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df.sort_values("TRADEDATE").to_parquet(path, index=False)
+        return len(df) - len(old)
+
+    def missing(self, security: Security, start="", end="") -> np.ndarray:
+        """Trading days absent in stored history, needs a calendar."""
+        if self.calendar is None:
+            raise ValueError("HistoryStore needs a calendar to find missing dates.")
+        df = self.read_raw(security)
+        dates = df["TRADEDATE"] if len(df) else []
+        return self.calendar.missing(dates, start, end)
+
+    def refresh(self, securities: Iterable[Security]) -> Dict[str, int]:
+        """Update many securities concurrently, return new rows by ticker."""
+        securities = list(securities)
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            counts = list(pool.map(self.update, securities))
+        return {s.ticker: n for s, n in zip(securities, counts)}
+
+    def needs_update(self, security: Security, end="") -> bool:
+        last = self.last_date(security)
+        return self.update_on_read or last is None or bool(end) and last < end
+
+    def get_history_json(self, security: Security, columns=[], start="", end=""):
+        if self.needs_update(security, end):
+            self.update(security)
+        df = self.read_raw(security)
+        if len(df) == 0:
+            return []
+        if start:
+            df = df[df["TRADEDATE"] >= start]
+        if end:
+            df = df[df["TRADEDATE"] <= end]
+        if columns == []:
+            columns = security.default_columns
+        if columns:
+            df = df[[c for c in columns if c in df.columns]]
+        df = df.astype(object).where(df.notna(), None)
+        return df.to_dict("records")
+
+    def get_history(self, security: Security, columns=[], start="", end=""):
+        """Same as `security.get_history()`, reading from local store."""
+        return dataframe(self.get_history_json(security, columns, start, end))
@@ -0,0 +1,109 @@
+"""finec.total_return - Dividend-adjusted prices and total return indices.
+
+Works on a wide CLOSE panel (dates x tickers, like `datasets/IMOEX_CLOSE.csv`)
+and a dividend table with `ticker`, `date` and `dividends` columns
+(see `finec.dividend.get_dividend_all()`). All tickers are computed at once
+with NumPy cumulative products.
+
+  import pandas as pd
+  from finec.dividend import get_dividend_all
+  from finec.total_return import total_return_index
+
+  close = pd.read_csv("datasets/IMOEX_CLOSE.csv", index_col=0, parse_dates=True)
+  tr = total_return_index(close, get_dividend_all())
+
+Dividend `date` is the record date. A dividend is credited on the ex-date,
+when the price drops: the last trading day on or before the record date,
+shifted back by settlement lag (one trading day under T+2 settlement,
+used by Moscow Exchange for shares before 31 July 2023, none under T+1).
+Pass *lag* to use a fixed number of trading days instead. Dividends with
+record date outside of the price dates are skipped.
+
+Total return on day t is (P[t] + D[t]) / P[t-1]; missing prices are
+carried forward from the last trading day.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+__all__ = [
+    "dividend_matrix",
+    "adjustment_factors",
+    "adjusted_prices",
+    "total_return_index",
+]
+
+T1_SINCE = pd.Timestamp("2023-07-31")
+
+
+def settlement_lag(record_dates: pd.DatetimeIndex) -> np.ndarray:
+    """Trading days from ex-date to record date: 1 under T+2, 0 under T+1."""
+    return np.where(record_dates < T1_SINCE, 1, 0)
+
+
+def dividend_matrix(
+    dates: pd.DatetimeIndex,
+    tickers: pd.Index,
+    dividends: pd.DataFrame,
+    currency: Optional[str] = "RUR",
+    lag: Optional[int] = None,
+) -> np.ndarray:
+    """Dividends per share aligned to ex-dates in *dates* x *tickers*.
+
+    Rows with other *currency* are skipped (use currency=None to keep all).
+    *lag* is trading days from ex-date to record date, by settlement cycle
+    if None.
+    """
+    df = dividends
+    if currency and "currency" in df.columns:
+        df = df[df["currency"] == currency]
+    cols = tickers.get_indexer(df["ticker"])
+    record_dates = pd.DatetimeIndex(pd.to_datetime(df["date"]))
+    lags = settlement_lag(record_dates) if lag is None else lag
+    rows = dates.searchsorted(record_dates, side="right") - 1 - lags
+    in_range = len(dates) > 0 and record_dates <= dates[-1]
+    mask = (cols >= 0) & (rows >= 0) & in_range
+    D = np.zeros((len(dates), len(tickers)))
+    np.add.at(D, (rows[mask], cols[mask]), df["dividends"].to_numpy(dtype=float)[mask])
+    return D
+
+
+def growth_ratios(close: pd.DataFrame, dividends: pd.DataFrame, **kwargs):
+    """Return forward-filled prices and daily ratios 1 + D/P (1 without price)."""
+    P = close.ffill().to_numpy(dtype=float)
+    D = dividend_matrix(close.index, close.columns, dividends, **kwargs)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio = 1 + D / P
+    return P, np.where(np.isfinite(ratio), ratio, 1.0)
+
+
+def adjustment_factors(close: pd.DataFrame, dividends: pd.DataFrame, **kwargs):
+    """Multipliers for *close* that make price changes equal total returns.
+
+    Last factor for each ticker is 1, so latest prices are unchanged.
+    """
+    _, ratio = growth_ratios(close, dividends, **kwargs)
+    G = np.cumprod(ratio, axis=0)
+    F = G / G[-1]
+    return pd.DataFrame(F, index=close.index, columns=close.columns)
+
+
+def adjusted_prices(close: pd.DataFrame, dividends: pd.DataFrame, **kwargs):
+    return close * adjustment_factors(close, dividends, **kwargs)
+
+
+def total_return_index(
+    close: pd.DataFrame, dividends: pd.DataFrame, base: float = 1.0, **kwargs
+):
+    """Total return index for every ticker, equal to *base* at first price."""
+    P, ratio = growth_ratios(close, dividends, **kwargs)
+    G = np.cumprod(ratio, axis=0)
+    has_price = ~np.isnan(P)
+    first = has_price.argmax(axis=0)
+    cols = np.arange(P.shape[1])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        level = P * G / (P[first, cols] * G[first, cols])
+    level[~has_price] = np.nan
+    return pd.DataFrame(base * level, index=close.index, columns=close.columns)
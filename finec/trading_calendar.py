@@ -0,0 +1,113 @@
+"""finec.trading_calendar - Exchange trading days as a sorted datetime64 array.
+
+Calendar is taken from TRADEDATE of a reference instrument history
+(IMOEX index by default) and kept in `local_directory()` as a .npy file.
+On update only dates after the last stored day are requested.
+
+  from finec.trading_calendar import trading_calendar
+
+  cal = trading_calendar()
+  cal.between("2022-01-01", "2022-03-31")
+  cal.missing(Stock("SBER").get_history().index, start="2022-01-01")
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from finec.cache import moscow_today
+from finec.directory import local_directory
+from finec.moex import Index, Security, get_columns, make_query_dict
+
+__all__ = ["TradingCalendar", "trading_calendar", "update_calendar"]
+
+REFERENCE = Index("IMOEX")
+
+
+def as_days(values) -> np.ndarray:
+    return np.asarray(values, dtype="datetime64[D]")
+
+
+def as_day(value) -> np.datetime64:
+    return np.datetime64(str(value)[:10], "D")
+
+
+@dataclass
+class TradingCalendar:
+    dates: np.ndarray
+
+    def __post_init__(self):
+        self.dates = np.unique(as_days(self.dates))
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __contains__(self, day) -> bool:
+        i = self.dates.searchsorted(as_day(day))
+        return i < len(self.dates) and self.dates[i] == as_day(day)
+
+    @property
+    def first(self) -> Optional[str]:
+        return str(self.dates[0]) if len(self.dates) else None
+
+    @property
+    def last(self) -> Optional[str]:
+        return str(self.dates[-1]) if len(self.dates) else None
+
+    def between(self, start="", end="") -> np.ndarray:
+        """Trading days from *start* to *end* inclusive, empty means open end."""
+        i = self.dates.searchsorted(as_day(start)) if start else 0
+        j = self.dates.searchsorted(as_day(end), side="right") if end else len(self)
+        return self.dates[i:j]
+
+    def after(self, day) -> np.ndarray:
+        return self.dates[self.dates.searchsorted(as_day(day), side="right") :]
+
+    def missing(self, dates, start="", end="") -> np.ndarray:
+        """Trading days between *start* and *end* that are not in *dates*.
+
+        Range defaults to first and last of *dates*.
+        """
+        dates = as_days(dates)
+        if not len(dates):
+            return self.between(start, end)
+        start = start or dates.min()
+        end = end or dates.max()
+        return np.setdiff1d(self.between(start, end), dates, assume_unique=False)
+
+
+def default_path(reference: Security = REFERENCE) -> Path:
+    return local_directory() / f"finec_calendar_{reference.ticker}.npy"
+
+
+def read_dates(path: Path) -> np.ndarray:
+    return np.load(path) if path.exists() else as_days([])
+
+
+def fetch_dates(reference: Security, start="") -> np.ndarray:
+    param = make_query_dict(["TRADEDATE"], start, "")
+    block = get_columns(reference.history_endpoint, param)["history"]
+    return as_days([row[0] for row in block["data"]])
+
+
+def update_calendar(reference: Security = REFERENCE, path=None) -> TradingCalendar:
+    """Download trading days after last stored day and save calendar."""
+    path = Path(path or default_path(reference))
+    dates = read_dates(path)
+    last = str(dates.max()) if len(dates) else ""
+    if last >= moscow_today():
+        return TradingCalendar(dates)
+    start = str(as_day(last) + 1) if last else ""
+    calendar = TradingCalendar(np.concatenate([dates, fetch_dates(reference, start)]))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.save(path, calendar.dates)
+    return calendar
+
+
+def trading_calendar(update=True, reference: Security = REFERENCE, path=None):
+    """Stored calendar, brought up to date unless *update* is False."""
+    if update:
+        return update_calendar(reference, path)
+    return TradingCalendar(read_dates(Path(path or default_path(reference))))
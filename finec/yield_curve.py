@@ -5,6 +5,7 @@ https://github.com/cmf-team/pricer/issues/3#issuecomment-1264697353
 """
 #%%
 from dataclasses import dataclass
+from functools import lru_cache
 import numpy as np
 from finec.moex import Endpoint
 from typing import Dict, Optional
@@ -15,6 +16,7 @@ a2 = 0.6
 k = 1.6
 
 
+@lru_cache(maxsize=None)
 def fa(n: int):
     if n == 1:
         return a1
@@ -23,6 +25,7 @@ def fa(n: int):
     return fa(n - 1) + fa(2) * k ** (n - 2)
 
 
+@lru_cache(maxsize=None)
 def fb(n: int):
     if n == 1:
         return fa(2)
@@ -30,29 +33,75 @@ def fb(n: int):
         return fb(n - 1) * k
 
 
-def s(t, params):
-    res = 0
-    for i in range(1, 9 + 1):
-        g = params[f"g{i}"]
-        res += g * np.exp(-((t - fa(i)) ** 2) / fb(i) ** 2)
-    return res
+# Knots of the nine gaussian terms, computed once
+A = np.array([fa(i) for i in range(1, 9 + 1)])
+B = np.array([fb(i) for i in range(1, 9 + 1)])
 
+PARAM_NAMES = ["b1", "b2", "b3", "t1"] + [f"g{i}" for i in range(1, 9 + 1)]
 
-def G(t, params):
-    tau = params["t1"]
-    b1 = params["b1"]
-    b2 = params["b2"]
-    b3 = params["b3"]
-    return (
+
+def as_vector(params: Dict) -> np.ndarray:
+    return np.array([params[name] for name in PARAM_NAMES], dtype=float)
+
+
+def g_values(vectors, t):
+    """G(t) in basis points for parameter *vectors* of shape (..., 13).
+
+    Returns array of shape (..., len(t)), or (...) for scalar *t*.
+    """
+    P = np.asarray(vectors, dtype=float)
+    ts = np.atleast_1d(np.asarray(t, dtype=float))
+    b1, b2, b3, tau = (P[..., i, None] for i in range(4))
+    x = ts / tau
+    gauss = np.exp(-((ts[:, None] - A) ** 2) / B**2)
+    res = (
         b1
-        + (b2 + b3) * (tau / t) * (1 - np.exp(-t / tau))
-        - b3 * np.exp(-t / tau)
-        + s(t, params)
+        + (b2 + b3) * (1 - np.exp(-x)) / x
+        - b3 * np.exp(-x)
+        + P[..., 4:] @ gauss.T
     )
+    return res[..., 0] if np.ndim(t) == 0 else res
+
+
+def y_values(vectors, t):
+    return 10_000 * (np.exp(g_values(vectors, t) / 10_000) - 1)
+
+
+@dataclass
+class Curve:
+    """Zero-coupon yield curve for one parameter set, vectorized over maturities."""
+
+    vector: np.ndarray
+
+    @classmethod
+    def from_params(cls, params: Dict):
+        return cls(as_vector(params))
+
+    def G(self, t):
+        """Continuously compounded zero-coupon yield, basis points."""
+        return g_values(self.vector, t)
+
+    def rate(self, t):
+        """Annually compounded zero-coupon yield, basis points."""
+        return y_values(self.vector, t)
+
+    def discount(self, t):
+        t = np.asarray(t, dtype=float)
+        return np.exp(-self.G(t) / 10_000 * t)
+
+
+def s(t, params):
+    ts = np.atleast_1d(np.asarray(t, dtype=float))
+    res = np.exp(-((ts[:, None] - A) ** 2) / B**2) @ as_vector(params)[4:]
+    return res[0] if np.ndim(t) == 0 else res
+
+
+def G(t, params):
+    return Curve.from_params(params).G(t)
 
 
 def Y(t, params):
-    return 10_000 * (np.exp(G(t, params) / 10_000) - 1)
+    return Curve.from_params(params).rate(t)
 
 
 def yield_curve_parameters(date: str):
@@ -78,13 +127,138 @@ class YieldCurve:
     def last(self):
         return self.params[-1]
 
-    def rate(self, t: float):
-        return Y(t, self.last)
+    @property
+    def curve(self) -> Curve:
+        return Curve.from_params(self.last)
+
+    def rate(self, t):
+        return self.curve.rate(t)
+
+    def intraday(self) -> "IntradayCurves":
+        """All parameter sets of the day, without new request."""
+        return IntradayCurves(self.iso_date, *intraday_matrix(self.params))
+
+
+#%%
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import field
+from typing import List, Tuple
+import pandas as pd
+
+
+def yield_curve_parameters_many(dates: List[str], max_workers: int = 8) -> List[Dict]:
+    """Last parameter set for each of *dates*, requested concurrently.
+
+    Dates without curve (holidays) are skipped.
+    """
+    with ThreadPoolExecutor(max_workers) as pool:
+        results = list(pool.map(yield_curve_parameters, dates))
+    by_date = {ps[-1]["tradedate"]: ps[-1] for ps in results if ps}
+    return [by_date[d] for d in sorted(by_date)]
+
+
+def parameter_matrix(params_list: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    dates = np.array([p["tradedate"] for p in params_list], dtype="datetime64[D]")
+    matrix = np.array([as_vector(p) for p in params_list]).reshape(-1, len(PARAM_NAMES))
+    return dates, matrix
+
+
+def intraday_matrix(params_list: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    moments = np.array(
+        [f"{p['tradedate']}T{p['tradetime']}" for p in params_list],
+        dtype="datetime64[s]",
+    )
+    matrix = np.array([as_vector(p) for p in params_list]).reshape(-1, len(PARAM_NAMES))
+    return moments, matrix
+
+
+class CurveSurface:
+    """Methods for parameter `matrix` with rows indexed by time in `index`."""
+
+    index: np.ndarray
+    matrix: np.ndarray
+
+    def surface(self, t) -> np.ndarray:
+        """Zero-coupon yields for all rows and maturities *t*, basis points."""
+        return y_values(self.matrix, np.atleast_1d(t))
+
+    def to_frame(self, t) -> pd.DataFrame:
+        ts = np.atleast_1d(t)
+        return pd.DataFrame(
+            self.surface(ts), index=pd.DatetimeIndex(self.index), columns=ts
+        )
+
+    def changes(self, t) -> np.ndarray:
+        """Yield changes between consecutive rows, basis points."""
+        return np.diff(self.surface(t), axis=0)
+
+    def as_of(self, when: str) -> Curve:
+        key = np.datetime64(when).astype(self.index.dtype)
+        i = np.searchsorted(self.index, key, side="right")
+        if i == 0:
+            raise KeyError(when)
+        return Curve(self.matrix[i - 1])
+
+
+@dataclass
+class YieldCurveHistory(CurveSurface):
+    """Curve parameters for business days from *start* to *end*.
+
+    `matrix` is dates x parameters (columns as in PARAM_NAMES).
+
+      h = YieldCurveHistory("2022-09-01", "2022-09-30")
+      h.surface([0.5, 1, 5, 10])  # dates x maturities, basis points
+    """
+
+    start: str
+    end: str
+    dates: np.ndarray = field(default=None, repr=False, compare=False)
+    matrix: np.ndarray = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.matrix is None:
+            days = pd.bdate_range(self.start, self.end).strftime("%Y-%m-%d")
+            params_list = yield_curve_parameters_many(list(days))
+            self.dates, self.matrix = parameter_matrix(params_list)
+
+    @property
+    def index(self):
+        return self.dates
+
+    def curve(self, iso_date: str) -> Curve:
+        return self.as_of(iso_date)
+
+
+@dataclass
+class IntradayCurves(CurveSurface):
+    """All curve parameter sets published during *iso_date*.
+
+    `matrix` is moments x parameters, `moments` are datetime64 timestamps.
+
+      d = IntradayCurves("2022-09-28")
+      d.surface([0.5, 1, 5, 10])  # moments x maturities, basis points
+      d.changes([1, 5])           # moves between consecutive moments
+    """
+
+    iso_date: str
+    moments: np.ndarray = field(default=None, repr=False, compare=False)
+    matrix: np.ndarray = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.matrix is None:
+            params_list = yield_curve_parameters(self.iso_date)
+            self.moments, self.matrix = intraday_matrix(params_list)
+
+    @property
+    def index(self):
+        return self.moments
 
 
 #%%
+from io import StringIO
 import pandas as pd
 from datetime import datetime
+from finec.client import CLIENT
 
 
 def make_date(iso_date: str):
@@ -98,7 +272,9 @@ def make_url(iso_date: str):
 
 
 def get_yields_from_cbr(iso_date: str) -> Dict[str, float]:
-    df = pd.read_html(make_url(iso_date))[0]
+    r = CLIENT.session.get(make_url(iso_date))
+    r.raise_for_status()
+    df = pd.read_html(StringIO(r.text))[0]
     return df.iloc[:, 1:].T.to_dict()[0]
 
 
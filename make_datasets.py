@@ -1,15 +1,17 @@
-import itertools
+"""Build files in datasets/ folder, resuming after interruption.
 
-from finec.dividend import get_dividend_all
-from finec.moex import Index, Stock, save_tickers
+  python make_datasets.py          # build targets not done yet today
+  python make_datasets.py --force  # rebuild everything
+"""
+import sys
 
-# Create dividend file
-get_dividend_all(directory="datasets", filename="dividend.csv", overwrite=True)
+from finec.pipeline import Pipeline, dividends, index_panel
 
-# Create IMOEX member company CLOSE prices - runs several minutes
-save_tickers(
-    path="datasets/IMOEX_CLOSE.csv",
-    security_class=Stock,
-    tickers=Index("IMOEX").tickers(),
-    field="CLOSE",
+# IMOEX member company CLOSE prices - runs several minutes
+pipeline = Pipeline(
+    [dividends("dividend"), index_panel("IMOEX", "CLOSE")],
+    directory="datasets",
 )
+
+if __name__ == "__main__":
+    pipeline.run(force="--force" in sys.argv)
@@ -0,0 +1,90 @@
+import asyncio
+
+import httpx
+
+import finec.aio
+from finec.aio import AsyncISS, loop_is_running, quote_many
+from finec.cache import ResponseCache
+from finec.moex import Stock, stocks_board
+
+
+def test_quote_many_same_as_get_history():
+    columns = ["TRADEDATE", "SECID", "CLOSE"]
+    dfs = quote_many(
+        stocks_board(), ["MGNT", "GAZP"], columns, "2021-11-15", "2021-11-16"
+    )
+    expected = Stock("MGNT").get_history(columns, "2021-11-15", "2021-11-16")
+    assert list(dfs.keys()) == ["MGNT", "GAZP"]
+    assert dfs["MGNT"].equals(expected)
+
+
+def test_aget_history_json():
+    res = asyncio.run(
+        Stock("MGNT").aget_history_json(["TRADEDATE", "CLOSE"], "2021-11-15", "2021-11-15")
+    )
+    assert res == [{"TRADEDATE": "2021-11-15", "CLOSE": 6499.5}]
+
+
+def test_loop_is_running():
+    async def inside():
+        return loop_is_running()
+
+    assert not loop_is_running()
+    assert asyncio.run(inside())
+
+
+class FakeISS:
+    def __init__(self):
+        self.endpoints = []
+
+    async def get_all(self, endpoint, param={}):
+        self.endpoints.append(endpoint)
+        return {"history": [{"TRADEDATE": "2021-11-15", "CLOSE": 1.0}]}
+
+
+def test_aget_history_uses_shared_iss():
+    iss = FakeISS()
+
+    async def main():
+        return await asyncio.gather(
+            Stock("MGNT").aget_history_json(["CLOSE"], iss=iss),
+            Stock("GAZP").aget_history_json(["CLOSE"], iss=iss),
+        )
+
+    res = asyncio.run(main())
+    assert res[0] == [{"TRADEDATE": "2021-11-15", "CLOSE": 1.0}]
+    assert [e.split("/")[-1] for e in iss.endpoints] == ["MGNT", "GAZP"]
+
+
+def test_yield_jsons_by_field_in_running_loop(monkeypatch):
+    from finec import moex
+
+    def fake_history(self, columns=[], start="", end=""):
+        return [{"TRADEDATE": "2021-11-15", "SECID": self.ticker, "CLOSE": 1.0}]
+
+    monkeypatch.setattr(moex.Security, "get_history_json", fake_history)
+
+    async def inside():
+        return list(moex.yield_jsons_by_field(Stock, ["MGNT", "GAZP"], "CLOSE"))
+
+    res = asyncio.run(inside())
+    assert [j["SECID"] for j in res] == ["MGNT", "GAZP"]
+
+
+def test_async_iss_retries_server_errors(monkeypatch):
+    statuses = [503, 429, 200]
+
+    def handler(request):
+        return httpx.Response(statuses.pop(0), json=[{}, {"history": []}])
+
+    monkeypatch.setattr(finec.aio, "CACHE", ResponseCache(enabled=False))
+    iss = AsyncISS(rate=None)  # created outside of event loop
+    iss.backoff_factor = 0
+    iss.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def main():
+        async with iss:
+            return await iss.get("/iss/history/engines/stock/markets/shares/securities/X")
+
+    assert asyncio.run(main()) == {"history": []}
+    assert statuses == []
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from finec.bond_math import board_analytics, cashflow_matrix, convexity, durations, ytm
+
+CASHFLOWS = pd.DataFrame(
+    dict(
+        secid=["A", "A", "A", "B", "A", "X"],
+        date=["2021-01-01", "2022-01-01", "2023-01-01", "2022-01-01", "2023-01-01", "2022-01-01"],
+        value=[10.0, 10.0, 10.0, 105.0, 100.0, 1.0],
+    )
+)
+
+
+class FlatCurve:
+    def __init__(self, bp):
+        self.bp = bp
+
+    def rate(self, t):
+        return np.full(np.shape(t), self.bp)
+
+
+def test_cashflow_matrix_pads_and_drops_past_payments():
+    T, C = cashflow_matrix(CASHFLOWS, ["A", "B"], "2021-01-01")
+    assert C.tolist() == [[10.0, 110.0], [105.0, 0.0]]
+    assert np.allclose(T[:, 0], 1)
+    assert np.allclose(T[0, 1], 730 / 365)
+
+
+def test_unknown_coupon_gives_nan_yield():
+    cashflows = pd.DataFrame(
+        dict(
+            secid=["A", "A", "A", "B"],
+            date=["2022-01-01", "2023-01-01", "2023-01-01", "2022-01-01"],
+            value=[10.0, np.nan, 100.0, 110.0],
+        )
+    )
+    T, C = cashflow_matrix(cashflows, ["A", "B"], "2021-01-01")
+    assert np.isnan(C[0, 1])
+    y = ytm(C, T, [100, 100])
+    assert np.isnan(y[0])
+    assert np.allclose(y[1], 0.1)
+    assert np.isnan(durations(C, T, y)[0][0])
+
+
+def test_par_bond_yield_duration_convexity():
+    T, C = np.array([[1.0, 2.0]]), np.array([[10.0, 110.0]])
+    y = ytm(C, T, 100)
+    assert np.allclose(y, 0.1)
+    macaulay, modified = durations(C, T, y)
+    assert np.allclose(macaulay, (10 / 1.1 + 2 * 110 / 1.21) / 100)
+    assert np.allclose(modified, macaulay / 1.1)
+    assert np.allclose(convexity(C, T, y), (2 * 10 / 1.1 + 6 * 110 / 1.21) / 100 / 1.21)
+
+
+def test_board_analytics():
+    prices = pd.DataFrame(
+        dict(SECID=["A", "B", "C"], CLOSE=[100.0, 100.0, 95.0], ACCINT=[0.0, 0.0, 1.0], FACEVALUE=100),
+        index=pd.DatetimeIndex(["2021-01-01"] * 3, name="TRADEDATE"),
+    )
+    df = board_analytics(prices, CASHFLOWS, curve=FlatCurve(500))
+    assert np.allclose(df.YTM[:2], [0.1, 0.05], atol=1e-3)
+    assert np.isnan(df.YTM.iloc[2])
+    assert np.allclose(df.ZSPREAD.iloc[1], 0, atol=1e-6)
+    assert df.ZSPREAD.iloc[0] > 0.04
@@ -0,0 +1,31 @@
+import numpy as np
+
+import finec.bondization
+from finec.bond_math import cashflow_matrix
+from finec.bondization import bondization_many
+
+
+def fake_bondization_json(secid):
+    coupons = [[secid, "2022-01-01", 10.0, 10.0], [secid, "2023-01-01", None, None]]
+    amortizations = [[secid, "2023-01-01", 100.0, 100.0]]
+    offers = [[secid, "2022-06-01", "Put", 100.0]] if secid == "B" else []
+    return {
+        "coupons": {"columns": ["secid", "coupondate", "value", "valueprc"], "data": coupons},
+        "amortizations": {"columns": ["secid", "amortdate", "value", "valueprc"], "data": amortizations},
+        "offers": {"columns": ["secid", "offerdate", "offertype", "price"], "data": offers},
+    }
+
+
+def test_bondization_many(monkeypatch):
+    monkeypatch.setattr(finec.bondization, "bondization_json", fake_bondization_json)
+    s = bondization_many(["B", "A", "B"])
+    assert s.secids() == ["A", "B"]
+    df = s.cashflows
+    assert df.columns.tolist() == ["secid", "date", "kind", "value", "valueprc"]
+    assert df.secid.tolist() == ["A"] * 3 + ["B"] * 3
+    assert df.kind.tolist()[:3] == ["coupon", "coupon", "amortization"]
+    assert np.isnan(df.value[1])
+    assert s.offers.secid.tolist() == ["B"]
+    assert str(s.offers.date[0].date()) == "2022-06-01"
+    T, C = cashflow_matrix(df.fillna({"value": 0}), ["A"], "2021-01-01")
+    assert C.tolist() == [[10.0, 100.0]]
@@ -0,0 +1,50 @@
+from finec.cache import FOREVER, ResponseCache, moscow_today, ttl
+
+URL = "https://iss.moex.com/iss/history/engines/stock/markets/shares/boards/TQBR/securities/SBER.json"
+
+
+def test_ttl():
+    assert ttl(URL, {"till": "2021-11-16"}) == FOREVER
+    assert ttl(URL, {"from": "2021-11-16"}) == 15 * 60
+    assert ttl("https://iss.moex.com/iss/engines.json", {}) == 7 * 24 * 3600
+    assert ttl("https://iss.moex.com/iss/engines/stock/markets/shares/securities.json", {}) == 10
+    assert ttl("https://iss.moex.com/iss/securities/SBER.json", {}) == 24 * 3600
+    assert ttl("https://iss.moex.com/iss/securities/SU26238RMFS4/bondization.json", {}) == 7 * 24 * 3600
+    analytics = "https://iss.moex.com/iss/statistics/engines/stock/markets/index/analytics/IMOEX.json"
+    assert ttl(analytics, {"date": "2022-01-10"}) == FOREVER
+    assert ttl("https://example.com/other.json", {}) == 0
+
+
+def test_ttl_zcyc_today_not_cached():
+    zcyc = "https://iss.moex.com/iss/history/engines/stock/zcyc.json"
+    assert ttl(zcyc, {"date": "2022-01-10"}) == FOREVER
+    assert ttl(zcyc, {"date": moscow_today()}) == 0
+    assert ttl(zcyc, {}) == 0
+
+
+def test_get_and_put(tmpdir):
+    cache = ResponseCache(path=tmpdir / "cache.sqlite")
+    param = {"till": "2021-11-16", "history.columns": "CLOSE"}
+    assert cache.get(URL, param) is None
+    cache.put(URL, param, {"history": [{"CLOSE": 6551}]})
+    assert cache.get(URL, dict(reversed(param.items()))) == {"history": [{"CLOSE": 6551}]}
+
+
+def test_eviction_of_least_recently_used(tmpdir):
+    cache = ResponseCache(path=tmpdir / "cache.sqlite", max_bytes=1000)
+    data = {"history": [{"N": i**7 % 1000003} for i in range(100)]}
+    for day in ["01", "02", "03"]:
+        cache.put(URL, {"till": f"2021-11-{day}"}, data)
+    assert cache.get(URL, {"till": "2021-11-01"}) is None
+    assert cache.get(URL, {"till": "2021-11-03"}) == data
+    assert cache.size() <= 1000
+
+
+def test_running_total_matches_table(tmpdir):
+    cache = ResponseCache(path=tmpdir / "cache.sqlite", max_bytes=10**6)
+    for i in range(5):
+        cache.put(URL, {"till": "2021-11-01"}, {"history": list(range(i * 10))})
+        cache.put(URL, {"till": f"2021-11-{i + 10}"}, {"history": [i]})
+    assert cache._total == cache.size()
+    cache.clear()
+    assert cache._total == cache.size() == 0
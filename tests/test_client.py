@@ -0,0 +1,48 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from finec.client import Client, Settings
+
+
+def test_session_is_reused():
+    client = Client()
+    assert client.session is client.session
+
+
+def test_configure_applies_settings():
+    client = Client()
+    old = client.session
+    client.configure(pool_maxsize=32, retries=5, timeout=10)
+    adapter = client.session.get_adapter("https://iss.moex.com")
+    assert client.session is not old
+    assert adapter._pool_maxsize == 32
+    assert adapter.max_retries.total == 5
+    assert client.session.timeout == 10
+
+
+def test_url():
+    client = Client(Settings(base_url="http://127.0.0.1:8765"))
+    assert client.url("/iss/engines") == "http://127.0.0.1:8765/iss/engines.json"
+
+
+def test_concurrent_requests_are_capped(monkeypatch):
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def fake_request(self, method, url, **kwargs):
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.01)
+        with lock:
+            active.pop()
+
+    monkeypatch.setattr(requests.Session, "request", fake_request)
+    session = Client(Settings(pool_maxsize=3)).session
+    with ThreadPoolExecutor(12) as pool:
+        list(pool.map(lambda _: session.get("http://localhost"), range(24)))
+    assert max(peak) == 3
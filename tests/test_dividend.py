@@ -1,3 +1,4 @@
+import io
 from pathlib import Path
 import pandas as pd
 
@@ -24,3 +25,89 @@ def test_get_dividend(tmpdir):
 def test_get_dividend_all_no_param():
     df = get_dividend_all()
     assert len(df) >= 2387
+
+
+def test_dividend_table_lookup():
+    from finec.dividend import DividendTable
+
+    df = pd.DataFrame(
+        dict(
+            ticker=["SBER", "AFLT", "SBER", "GMKN"],
+            date=pd.to_datetime(["2021-05-10", "2019-07-01", "2020-10-02", "2021-06-10"]),
+            dividends=[18.7, 2.6, 18.7, 1021.22],
+            currency="RUR",
+        )
+    )
+    table = DividendTable(df)
+    assert table.get("SBER").date.dt.year.tolist() == [2020, 2021]
+    assert len(table.get("NONE")) == 0
+    assert table.get_many(["GMKN", "AFLT"]).ticker.tolist() == ["GMKN", "AFLT"]
+
+
+def test_dividend_table_is_memoized(tmpdir):
+    from finec.dividend import dividend_table, save
+
+    df = pd.DataFrame(
+        dict(ticker=["SBER"], date=pd.to_datetime(["2021-05-10"]), dividends=[18.7])
+    )
+    path = Path(tmpdir) / "div.parquet"
+    save(df, path)
+    assert dividend_table(path) is dividend_table(path)
+    assert len(dividend_table(path).get("SBER")) == 1
+
+
+def test_file_format_from_extension(tmpdir):
+    import pytest
+
+    from finec.dividend import read, save
+
+    df = pd.DataFrame(
+        dict(ticker=["SBER"], date=pd.to_datetime(["2021-05-10"]), dividends=[18.7])
+    )
+    for name in ["div.csv", "div.CSV", "div.csv.gz"]:
+        path = Path(tmpdir) / name
+        save(df, path)
+        assert not path.read_bytes().startswith(b"PAR1")
+        assert read(path).equals(df)
+    with pytest.raises(ValueError):
+        save(df, Path(tmpdir) / "div.txt")
+
+
+class FakeDump:
+    def __init__(self, status_code, content=b"", headers={}):
+        self.status_code = status_code
+        self.raw = io.BytesIO(content)
+        self.headers = headers
+
+    def raise_for_status(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+def test_refresh_dividends_revalidates(tmpdir, monkeypatch):
+    import bson
+
+    import finec.dividend
+
+    doc = {"_id": "SBER", "df": [{"date": pd.Timestamp("2021-05-10"), "dividends": 18.7}]}
+    requests_headers = []
+
+    def fake_request_dump(url, headers={}):
+        requests_headers.append(headers)
+        if headers.get("If-None-Match") == '"v1"':
+            return FakeDump(304)
+        return FakeDump(200, bson.encode(doc) * 2, {"ETag": '"v1"'})
+
+    monkeypatch.setattr(finec.dividend, "request_dump", fake_request_dump)
+    path = Path(tmpdir) / "div.parquet"
+    assert finec.dividend.refresh_dividends(path)
+    assert not finec.dividend.refresh_dividends(path)
+    assert requests_headers == [{}, {"If-None-Match": '"v1"'}]
+    assert finec.dividend.get_dividend("SBER", path).dividends.tolist() == [18.7, 18.7]
+    finec.dividend.erase_local_file(path)
+    assert not path.exists()
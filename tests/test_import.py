@@ -0,0 +1,18 @@
+import subprocess
+import sys
+
+
+def run(code):
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert out.returncode == 0, out.stderr
+    return out.stdout
+
+
+def test_import_moex_does_not_load_dividends():
+    modules = run("import sys, finec.moex; print(' '.join(sys.modules))").split()
+    assert "finec.dividend" not in modules
+    assert "bson" not in modules
+
+
+def test_import_prints_nothing():
+    assert run("import finec.moex, finec.yield_curve, finec.dividend") == ""
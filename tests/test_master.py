@@ -0,0 +1,96 @@
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+
+import finec.master
+from finec.master import (
+    LISTING_COLUMNS,
+    SecurityMaster,
+    add_type_titles,
+    download_listing,
+    download_types,
+    security_master,
+)
+
+
+def listing_row(i):
+    row = dict.fromkeys(LISTING_COLUMNS)
+    row.update(secid=f"S{i:03}", isin=f"RU{i:010}", regnumber=f"1-{i}", name=f"Name {i}")
+    return [row[c] for c in LISTING_COLUMNS]
+
+
+ROWS = [listing_row(i) for i in range(250)]
+
+
+def make_master():
+    securities = pd.DataFrame(ROWS, columns=LISTING_COLUMNS)
+    boards = pd.DataFrame(
+        [("S001", "stock", "shares", "TQBR"), ("S000", "stock", "shares", "TQBR"), ("S001", "stock", "shares", "SMAL")],
+        columns=["secid", "engine", "market", "boardid"],
+    )
+    return SecurityMaster(securities, boards)
+
+
+def test_download_listing_in_waves(monkeypatch):
+    requested = []
+
+    def fake_listing_page(start):
+        requested.append(start)
+        return ROWS[start : start + 100]
+
+    monkeypatch.setattr(finec.master, "listing_page", fake_listing_page)
+    df = download_listing(max_workers=2)
+    assert len(df) == 250
+    assert sorted(requested) == [0, 100, 200, 300]
+
+
+def test_master_lookup_and_enrich(tmpdir):
+    make_master().save(tmpdir)
+    m = security_master(tmpdir)
+    assert m.describe("S007")["name"] == "Name 7"
+    assert m.describe("RU0000000007")["secid"] == "S007"
+    assert m.describe("1-7")["secid"] == "S007"
+    assert "S999" not in m
+    assert m.traded_boards("S001") == ["TQBR", "SMAL"]
+    assert m.traded_boards("S002") == []
+    df = m.enrich(pd.DataFrame({"SECID": ["S002", "XXXX"], "CLOSE": [1.0, 2.0]}), columns=["isin"])
+    assert df["isin"].tolist()[0] == "RU0000000002"
+    assert pd.isna(df["isin"].tolist()[1])
+
+
+def test_stale_master_is_rebuilt(tmpdir, monkeypatch):
+    make_master().save(tmpdir)
+    path = Path(tmpdir) / "securities.parquet"
+    old = time.time() - finec.master.MAX_AGE - 60
+    os.utime(path, (old, old))
+    built = []
+
+    def fake_build_master(directory=None, max_workers=None):
+        built.append(directory)
+        make_master().save(directory)
+
+    monkeypatch.setattr(finec.master, "build_master", fake_build_master)
+    security_master(tmpdir, max_age=None)
+    assert built == []
+    security_master(tmpdir)
+    assert built == [Path(tmpdir)]
+
+
+def test_type_titles(monkeypatch):
+    def fake_get_compact(endpoint, param={}):
+        assert endpoint == "/iss/index"
+        data = [
+            ["common_share", "Акция обыкновенная"],
+            ["common_share", "Акция обыкновенная"],
+            ["corporate_bond", "Корпоративная облигация"],
+        ]
+        return {"securitytypes": {"columns": ["a", "b"], "data": data}}
+
+    monkeypatch.setattr(finec.master, "get_compact", fake_get_compact)
+    listing = pd.DataFrame({"secid": ["S1", "S2", "S3"], "type": ["common_share", "etf_ppif", "corporate_bond"]})
+    df = add_type_titles(listing, download_types())
+    assert df["secid"].tolist() == ["S1", "S2", "S3"]
+    assert df["type_title"].tolist()[0] == "Акция обыкновенная"
+    assert pd.isna(df["type_title"][1])
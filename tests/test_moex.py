@@ -435,3 +435,156 @@ def test_index_tickers():
         "VTBR",
         "YNDX",
     ]
+
+
+class FakeISSClient:
+    def __init__(self, total, pagesize=100, cursor=True):
+        self.total = total
+        self.pagesize = pagesize
+        self.cursor = cursor
+
+    def get(self, start=None):
+        start = start or 0
+        rows = [{"N": i} for i in range(start, min(start + self.pagesize, self.total))]
+        data = {"history": rows}
+        if self.cursor:
+            data["history.cursor"] = [
+                {"INDEX": start, "TOTAL": self.total, "PAGESIZE": self.pagesize}
+            ]
+        return data
+
+
+def test_get_pages_with_cursor():
+    res = moex.get_pages(FakeISSClient(total=1050))
+    assert res == {"history": [{"N": i} for i in range(1050)]}
+
+
+def test_get_pages_share_one_pool():
+    moex.get_pages(FakeISSClient(total=1050))
+    pool = moex.page_pool()
+    moex.get_pages(FakeISSClient(total=1050))
+    assert moex.page_pool() is pool
+    assert pool._max_workers == moex.MAX_WORKERS
+
+
+def test_get_pages_without_cursor():
+    res = moex.get_pages(FakeISSClient(total=250, cursor=False))
+    assert res == {"history": [{"N": i} for i in range(250)]}
+
+
+class FakeCandlesClient:
+    def __init__(self, session, url, query):
+        self.query = query
+
+    def get(self, start=None):
+        start = start or 0
+        rows = [
+            {
+                "open": 100.5,
+                "close": 101.0,
+                "high": 102.0,
+                "low": 99.0,
+                "value": 1e9,
+                "volume": 1000 + i,
+                "begin": f"2022-01-01 10:{i:02d}:00",
+                "end": f"2022-01-01 10:{i:02d}:59",
+            }
+            for i in range(start, min(start + 25, 60))
+        ]
+        return {"candles": rows}
+
+
+def test_get_candles(monkeypatch):
+    monkeypatch.setattr(moex, "CachedISSClient", FakeCandlesClient)
+    df = moex.Stock("SBER").get_candles(interval=1)
+    assert len(df) == 60
+    assert df["close"].dtype == "float64"
+    assert str(df.index[-1]) == "2022-01-01 10:59:00"
+    df = moex.Stock("SBER").get_candles(interval=1, compact=True)
+    assert df["close"].dtype == "float32"
+    assert df["volume"].dtype == "int64"
+    assert str(df.index[-1]) == "2022-01-01 10:59:00"
+    assert [len(b) for b in moex.Stock("SBER").iter_candles(interval=1)] == [25, 25, 10]
+
+
+def test_candles_frame_compact_missing_volume():
+    rows = [{"close": 1.5, "volume": 10}, {"close": 2.5, "volume": None}]
+    df = moex.candles_frame(rows, compact=True)
+    assert df["volume"].dtype == "Int64"
+    assert df["volume"].isna().tolist() == [False, True]
+
+
+def test_get_candles_wrong_interval():
+    import pytest
+
+    with pytest.raises(ValueError):
+        moex.Stock("SBER").get_candles(interval=5)
+
+
+def test_get_candles_daily():
+    df = moex.Stock("MGNT").get_candles(24, start="2021-11-15", end="2021-11-16")
+    assert df["close"].tolist() == [6499.5, 6551]
+
+
+def test_frame_same_as_dataframe():
+    block = {
+        "columns": ["BOARDID", "TRADEDATE", "SECID", "CLOSE", "MATDATE", "OFFERDATE"],
+        "data": [
+            ["TQCB", "2022-04-15", "RU000A101NJ6", 79.5, "2025-05-08", "0000-00-00"],
+            ["TQCB", "2022-04-18", "RU000A101NJ6", 80.1, "2025-05-08", None],
+        ],
+    }
+    records = [dict(zip(block["columns"], row)) for row in block["data"]]
+    df = moex.frame(block)
+    assert df.equals(moex.dataframe(records))
+    assert df["SECID"].dtype == "category"
+    assert df["OFFERDATE"].isna().all()
+    assert str(df.index[0].date()) == "2022-04-15"
+
+
+def test_market_columns_sent_to_server(monkeypatch):
+    requested = []
+
+    def fake_get_columns(endpoint, param={}):
+        requested.append((endpoint, param))
+        block = param.get("iss.only", "history")
+        return {block: {"columns": ["SECID"], "data": [["GAZP"], ["SBER"]]}}
+
+    monkeypatch.setattr(moex, "get_columns", fake_get_columns)
+    monkeypatch.setattr(moex, "get_compact", fake_get_columns)
+    m = moex.Market("stock", "shares")
+    assert m.tickers() == ["GAZP", "SBER"]
+    m.history(columns=["SECID"], date="2022-09-28")
+    m.yields(columns=["SECID"])
+    assert requested == [
+        (
+            "/iss/engines/stock/markets/shares/securities",
+            {"securities.columns": "SECID", "iss.only": "securities"},
+        ),
+        (
+            "/iss/history/engines/stock/markets/shares/securities",
+            {"history.columns": "SECID", "date": "2022-09-28"},
+        ),
+        (
+            "/iss/engines/stock/markets/shares/securities",
+            {"marketdata_yields.columns": "SECID", "iss.only": "marketdata_yields"},
+        ),
+    ]
+
+
+class StartIgnoringClient:
+    requests = 0
+
+    def __init__(self, session, url, query):
+        pass
+
+    def get(self, start=None):
+        StartIgnoringClient.requests += 1
+        return {"securities": {"columns": ["SECID"], "data": [["GAZP"], ["SBER"]]}}
+
+
+def test_board_securities_single_request(monkeypatch):
+    monkeypatch.setattr(moex, "CompactISSClient", StartIgnoringClient)
+    tickers = moex.stocks_board().tickers()
+    assert tickers == ["GAZP", "SBER"]
+    assert StartIgnoringClient.requests == 1
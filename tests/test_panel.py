@@ -0,0 +1,47 @@
+import numpy as np
+
+import finec.panel
+from finec.moex import Stock
+from finec.panel import Panel, build_panel
+
+HISTORY = {
+    "GAZP": [["2022-01-10", 100.0, 10], ["2022-01-11", None, None], ["2022-01-12", 102.0, 12]],
+    "SBER": [["2022-01-11", 300.0, 30], ["2022-01-12", 301.0, 0]],
+}
+
+
+def fake_get_columns(endpoint, param={}):
+    ticker = endpoint.split("/")[-1]
+    assert param["history.columns"] == "TRADEDATE,CLOSE,VOLUME"
+    columns = ["TRADEDATE", "CLOSE", "VOLUME"]
+    return {"history": {"columns": columns, "data": HISTORY[ticker]}}
+
+
+def test_build_panel(monkeypatch):
+    monkeypatch.setattr(finec.panel, "get_columns", fake_get_columns)
+    panel = build_panel(Stock, ["GAZP", "SBER"], ["CLOSE", "VOLUME"])
+    df = panel.to_frame("CLOSE")
+    assert [str(d.date()) for d in df.index] == ["2022-01-10", "2022-01-11", "2022-01-12"]
+    assert df["GAZP"].tolist()[::2] == [100.0, 102.0]
+    assert np.isnan(df["SBER"].iloc[0])
+    assert panel.to_frame("VOLUME")["SBER"].tolist()[1:] == [30.0, 0.0]
+    assert panel.values["CLOSE"].dtype == np.float64
+
+
+def test_build_panel_on_calendar_memory_mapped(monkeypatch, tmpdir):
+    monkeypatch.setattr(finec.panel, "get_columns", fake_get_columns)
+    calendar = ["2022-01-11", "2022-01-12"]
+    build_panel(Stock, ["GAZP", "SBER"], ["CLOSE", "VOLUME"], calendar=calendar, directory=tmpdir)
+    panel = Panel.load(tmpdir)
+    assert panel.tickers == ["GAZP", "SBER"]
+    assert sorted(panel.fields) == ["CLOSE", "VOLUME"]
+    assert panel.to_frame("CLOSE").loc["2022-01-12"].tolist() == [102.0, 301.0]
+
+
+def test_build_panel_sliced_trading_calendar(monkeypatch):
+    from finec.trading_calendar import TradingCalendar
+
+    monkeypatch.setattr(finec.panel, "get_columns", fake_get_columns)
+    calendar = TradingCalendar(["2022-01-10", "2022-01-11", "2022-01-12", "2022-01-13"])
+    panel = build_panel(Stock, ["GAZP"], ["CLOSE", "VOLUME"], start="2022-01-11", calendar=calendar)
+    assert [str(d) for d in panel.dates] == ["2022-01-11", "2022-01-12", "2022-01-13"]
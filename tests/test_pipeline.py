@@ -0,0 +1,92 @@
+import time
+
+import pandas as pd
+import pytest
+
+from finec.pipeline import Pipeline, Target, total_return_frame
+
+CALLS = []
+
+
+def close_prices():
+    CALLS.append("close")
+    index = pd.DatetimeIndex(["2022-01-03", "2022-01-04", "2022-01-05"], name="TRADEDATE")
+    return pd.DataFrame({"AAA": [10.0, 10.0, 11.0]}, index=index)
+
+
+def dividend_table():
+    CALLS.append("dividends")
+    # record date, credited on ex-date 2022-01-04
+    return pd.DataFrame(dict(ticker=["AAA"], date=pd.to_datetime(["2022-01-05"]), dividends=[1.0]))
+
+
+def failing():
+    raise RuntimeError("network is down")
+
+
+def slow():
+    time.sleep(0.2)
+    return pd.DataFrame({"x": [1]})
+
+
+def make_pipeline(tmpdir, extra=(), build="2022-01-05"):
+    return Pipeline(
+        [
+            Target("tr", total_return_frame, deps=("close", "dividend"), stage="transform"),
+            Target("close", close_prices),
+            Target("dividend", dividend_table, index=False),
+        ]
+        + list(extra),
+        directory=tmpdir,
+        build=build,
+    )
+
+
+def test_pipeline_builds_in_dependency_order_and_resumes(tmpdir):
+    CALLS.clear()
+    paths = make_pipeline(tmpdir).run()
+    assert sorted(CALLS) == ["close", "dividends"]
+    tr = pd.read_parquet(paths["tr"])
+    assert tr["AAA"].round(6).tolist() == [100.0, 110.0, 121.0]
+    assert pd.read_csv(tmpdir / "dividend.csv").columns.tolist() == ["ticker", "date", "dividends"]
+    assert pd.read_csv(tmpdir / "close.csv").columns.tolist() == ["TRADEDATE", "AAA"]
+    make_pipeline(tmpdir).run()
+    assert len(CALLS) == 2
+    make_pipeline(tmpdir).run(only=["close"], force=True)
+    assert len(CALLS) == 3
+
+
+def test_pipeline_keeps_checkpoint_on_failure(tmpdir):
+    pipeline = make_pipeline(tmpdir, [Target("broken", failing)])
+    with pytest.raises(RuntimeError):
+        pipeline.run()
+    assert "broken" not in pipeline.read_checkpoint()
+    pipeline.run(only=["tr"])
+    assert "tr" in pipeline.read_checkpoint()
+
+
+def test_pipeline_rebuilds_in_new_build(tmpdir):
+    CALLS.clear()
+    make_pipeline(tmpdir).run(only=["close"])
+    make_pipeline(tmpdir).run(only=["close"])
+    assert CALLS == ["close"]
+    make_pipeline(tmpdir, build="2022-01-06").run(only=["close"])
+    assert CALLS == ["close", "close"]
+
+
+def test_pipeline_saves_running_targets_on_failure(tmpdir):
+    pipeline = Pipeline([Target("slow", slow), Target("broken", failing)], directory=tmpdir)
+    with pytest.raises(RuntimeError):
+        pipeline.run()
+    assert list(pipeline.read_checkpoint()) == ["slow"]
+
+
+def test_force_only_keeps_other_targets_done(tmpdir):
+    CALLS.clear()
+    make_pipeline(tmpdir).run()
+    make_pipeline(tmpdir).run(only=["close"], force=True)
+    assert sorted(make_pipeline(tmpdir).read_checkpoint()) == ["close", "dividend"]
+    make_pipeline(tmpdir).run()
+    # tr is rebuilt from new close, dividends are not downloaded again
+    assert sorted(CALLS) == ["close", "close", "dividends"]
+    assert sorted(make_pipeline(tmpdir).read_checkpoint()) == ["close", "dividend", "tr"]
@@ -0,0 +1,50 @@
+import asyncio
+
+from finec.moex import stocks_board
+from finec.poller import MarketdataPoller
+
+COLUMNS = ["SECID", "LAST", "BID", "SEQNUM"]
+
+
+def response(version, seqnum, rows):
+    return {
+        "marketdata": {"columns": COLUMNS, "data": rows},
+        "dataversion": {"columns": ["data_version", "seqnum"], "data": [[version, seqnum]]},
+    }
+
+
+RESPONSES = [
+    response(1, 100, [["GAZP", 170.0, 169.9, 1], ["SBER", None, 130.0, 1]]),
+    response(1, 100, [["GAZP", 170.0, 169.9, 1], ["SBER", None, 130.0, 1]]),
+    response(1, 101, [["GAZP", 170.0, 169.9, 1], ["SBER", 130.5, 130.0, 2], ["VTBR", 0.02, 0.02, 2]]),
+    response(1, 102, [["GAZP", 170.0, 169.9, 1], ["SBER", 130.5, 130.0, 2], ["VTBR", 0.02, 0.02, 2]]),
+]
+
+
+def make_poller():
+    poller = MarketdataPoller(stocks_board(), columns=["LAST", "BID", "SEQNUM"], interval=0)
+    responses = iter(RESPONSES)
+    poller.client.get = lambda start=None: next(responses)
+    return poller
+
+
+def test_poll_emits_changed_rows_only():
+    poller = make_poller()
+    assert poller.poll().SECID.tolist() == ["GAZP", "SBER"]
+    assert poller.poll() is None
+    df = poller.poll()
+    assert df.SECID.tolist() == ["SBER", "VTBR"]
+    assert df.LAST.tolist() == [130.5, 0.02]
+    assert len(poller.poll()) == 0
+
+
+def test_run_and_async_iterator():
+    frames = []
+    make_poller().run(frames.append, ticks=4)
+    assert [len(df) for df in frames] == [2, 2]
+
+    async def first_two():
+        it = make_poller().changes()
+        return [len(await it.__anext__()), len(await it.__anext__())]
+
+    assert asyncio.run(first_two()) == [2, 2]
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import finec.replication
+from finec.replication import composition_history, replicate
+
+DATES = pd.date_range("2022-01-03", periods=6, freq="B", name="TRADEDATE")
+CLOSE = pd.DataFrame(
+    {"AAA": [10.0, 11, 12, 11, 13, 14], "BBB": [20.0, 20, 19, 21, np.nan, 22], "CCC": 5.0},
+    index=DATES,
+)
+
+
+def fake_composition_rows(index, date):
+    if date < "2022-01-06":
+        return [dict(tradedate="2022-01-03", ticker="AAA", weight=50.0),
+                dict(tradedate="2022-01-03", ticker="BBB", weight=50.0)]
+    return [dict(tradedate="2022-01-06", ticker="AAA", weight=30.0),
+            dict(tradedate="2022-01-06", ticker="CCC", weight=70.0)]
+
+
+def test_composition_history(monkeypatch):
+    monkeypatch.setattr(finec.replication, "composition_rows", fake_composition_rows)
+    W = composition_history("IMOEX", ["2022-01-03", "2022-01-04", "2022-01-06"])
+    assert W.columns.tolist() == ["AAA", "BBB", "CCC"]
+    assert W.to_numpy().tolist() == [[0.5, 0.5, 0.0], [0.3, 0.0, 0.7]]
+
+
+def test_composition_history_requires_start():
+    with pytest.raises(ValueError):
+        composition_history("IMOEX")
+
+
+def test_replicate_drifting_portfolio(monkeypatch):
+    monkeypatch.setattr(finec.replication, "composition_rows", fake_composition_rows)
+    W = composition_history("IMOEX", ["2022-01-03", "2022-01-06"])
+    P = CLOSE.ffill()
+    # buy and hold 50/50 portfolio, then 30/70 from 2022-01-06
+    first = (0.5 * P.AAA / 10 + 0.5 * P.BBB / 20)[:4]
+    second = first.iloc[-1] * (0.3 * P.AAA / 11 + 0.7 * P.CCC / 5)[3:]
+    index_close = 1000 * pd.concat([first, second.iloc[1:]])
+    df, te = replicate(CLOSE, W, index_close)
+    assert np.allclose(df.LEVEL, df.INDEX)
+    assert te < 1e-10
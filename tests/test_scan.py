@@ -0,0 +1,29 @@
+import finec.moex
+from finec.moex import Board
+from finec.scan import scan_boards
+
+TURNOVER = {
+    "TQBR": {"columns": ["BOARDID", "VOLUME", "VALUE"], "data": [["TQBR", 10, 100.0], ["TQBR", 5, 50.0]]},
+    "TQCB": {"columns": ["BOARDID", "VOLUME", "VALUE"], "data": [["TQCB", 1, 1000.0]]},
+    "EMPTY": {"columns": ["BOARDID", "VOLUME", "VALUE"], "data": []},
+}
+
+
+def test_scan_boards_sorted_by_value(monkeypatch):
+    requested = []
+
+    def fake_get_columns(endpoint, param={}):
+        requested.append(param)
+        board = endpoint.split("/")[-2]
+        return {"history": TURNOVER[board]}
+
+    monkeypatch.setattr(finec.moex, "get_columns", fake_get_columns)
+    boards = [
+        Board("stock", "shares", "TQBR"),
+        Board("stock", "bonds", "TQCB"),
+        Board("stock", "shares", "EMPTY"),
+    ]
+    df = scan_boards(boards)
+    assert df.board.tolist() == ["TQCB", "TQBR"]
+    assert df.volume.tolist() == [1, 15]
+    assert requested[0] == {"history.columns": "BOARDID,VOLUME,VALUE"}
@@ -0,0 +1,47 @@
+import pandas as pd
+
+from finec.master import LISTING_COLUMNS
+from finec.search import SearchIndex, trigrams
+
+SECURITIES = pd.DataFrame(
+    [
+        dict(secid="SBER", shortname="Сбербанк", name="Сбербанк России ПАО ао", isin="RU0009029540", is_traded=1, emitent_title="ПАО Сбербанк"),
+        dict(secid="SBERP", shortname="Сбербанк-п", name="Сбербанк России ПАО ап", isin="RU0009029557", is_traded=1, emitent_title="ПАО Сбербанк"),
+        dict(secid="RU000A0JXN21", shortname="СистемБ1P6", name='АФК "Система" ПАО БО-001P-06', isin="RU000A0JXN21", is_traded=1, emitent_title="АФК Система"),
+        dict(secid="oksa", shortname="РУСАЛ Саяногорск", name="РУСАЛ Саяногорский Алюминиевый Завод", isin="RU0006936150", is_traded=0, emitent_title=None),
+    ],
+    columns=LISTING_COLUMNS,
+)
+
+
+def test_trigrams_mark_word_start():
+    assert trigrams("Ёж") == {"  е", " еж", "еж "}
+
+
+def test_search_ranking_and_filters():
+    index = SearchIndex.from_frame(SECURITIES)
+    assert index.search("sber").secid.tolist()[:2] == ["SBER", "SBERP"]
+    assert index.search("сбербанк п").secid.tolist()[0] == "SBERP"
+    assert index.search("саяногорскии").secid.tolist() == ["oksa"]  # typo
+    assert index.search("саяногорский", is_traded=True).empty
+    assert index.search("RU000A0JXN21", limit=1).secid.tolist() == ["RU000A0JXN21"]
+    assert index.search("Сбербанк Р", substring=True).secid.tolist() == ["SBER", "SBERP"]
+    assert index.search("").empty
+
+
+def test_missing_values_get_no_exact_bonus():
+    securities = SECURITIES.copy()
+    securities.loc[3, "isin"] = None
+    index = SearchIndex.from_frame(securities)
+    assert index.scores("none").max() < 1
+    assert index.scores("nan").max() < 1
+
+
+def test_local_find_filters_like_remote(monkeypatch):
+    import finec.search
+    from finec.moex import find
+
+    index = SearchIndex.from_frame(SECURITIES)
+    monkeypatch.setattr(finec.search, "search_index", lambda directory, max_age: index)
+    assert [d["secid"] for d in find("Саяногорск", is_traded=False, local=True)] == ["oksa"]
+    assert find("Саяногорск", is_traded=True, local=True) == []
@@ -0,0 +1,62 @@
+import finec.store
+from finec.moex import Stock
+from finec.store import HistoryStore
+
+ROWS = [
+    {"TRADEDATE": "2021-11-15", "SECID": "MGNT", "CLOSE": 6499.5},
+    {"TRADEDATE": "2021-11-16", "SECID": "MGNT", "CLOSE": 6551.0},
+    {"TRADEDATE": "2021-11-17", "SECID": "MGNT", "CLOSE": 6480.0},
+]
+
+
+def test_store_requests_only_missing_days(tmpdir, monkeypatch):
+    requested = []
+
+    def fake_quote(board, ticker, columns=[], start="", end=""):
+        requested.append(start)
+        return [r for r in ROWS if r["TRADEDATE"] >= start]
+
+    monkeypatch.setattr(finec.store, "quote", fake_quote)
+    store = HistoryStore(tmpdir)
+    assert store.update(Stock("MGNT")) == 3
+    assert store.update(Stock("MGNT")) == 0
+    assert requested == ["", "2021-11-18"]
+    assert store.get_history_json(
+        Stock("MGNT"), ["TRADEDATE", "CLOSE"], end="2021-11-15"
+    ) == [{"TRADEDATE": "2021-11-15", "CLOSE": 6499.5}]
+    assert requested == ["", "2021-11-18"]  # stored range covers end
+    HistoryStore(tmpdir, update_on_read=True).get_history_json(Stock("MGNT"))
+    assert requested == ["", "2021-11-18", "2021-11-18"]
+
+
+def test_store_keeps_schema_on_append(tmpdir, monkeypatch):
+    pages = [
+        [{"TRADEDATE": "2021-11-15", "CLOSE": 6499.5, "NUMTRADES": 10}],
+        [{"TRADEDATE": "2021-11-16", "CLOSE": 6551, "NUMTRADES": 12, "NEW": "x"}],
+    ]
+    monkeypatch.setattr(finec.store, "quote", lambda *args: pages.pop(0))
+    store = HistoryStore(tmpdir)
+    store.update(Stock("MGNT"))
+    store.update(Stock("MGNT"))
+    df = store.read_raw(Stock("MGNT"))
+    assert df.columns.tolist() == ["TRADEDATE", "CLOSE", "NUMTRADES"]
+    assert df["NUMTRADES"].dtype == "int64"
+    assert df["CLOSE"].tolist() == [6499.5, 6551.0]
+
+
+def test_store_with_calendar_skips_request(tmpdir, monkeypatch):
+    from finec.trading_calendar import TradingCalendar
+
+    requested = []
+
+    def fake_quote(board, ticker, columns=[], start="", end=""):
+        requested.append(start)
+        return [r for r in ROWS if r["TRADEDATE"] >= start and r["TRADEDATE"] != "2021-11-16"]
+
+    monkeypatch.setattr(finec.store, "quote", fake_quote)
+    calendar = TradingCalendar([r["TRADEDATE"] for r in ROWS])
+    store = HistoryStore(tmpdir, calendar=calendar)
+    assert store.update(Stock("MGNT")) == 2
+    assert store.update(Stock("MGNT")) == 0
+    assert requested == [""]
+    assert [str(d) for d in store.missing(Stock("MGNT"))] == ["2021-11-16"]
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from finec.total_return import adjusted_prices, dividend_matrix, total_return_index
+
+close = pd.DataFrame(
+    {"AAA": [100.0, 100.0, 90.0, 95.0], "BBB": [np.nan, 10.0, np.nan, 12.0]},
+    index=pd.to_datetime(["2022-01-03", "2022-01-04", "2022-01-05", "2022-01-06"]),
+)
+dividends = pd.DataFrame(
+    {
+        "ticker": ["AAA", "BBB", "CCC"],
+        # record dates, ex-dates are one trading day earlier under T+2
+        "date": pd.to_datetime(["2022-01-06", "2022-01-04", "2022-01-06"]),
+        "dividends": [10.0, 1.0, 5.0],
+        "currency": "RUR",
+    }
+)
+
+
+def test_dividend_matrix():
+    D = dividend_matrix(close.index, close.columns, dividends)
+    assert D.tolist() == [[0, 1], [0, 0], [10, 0], [0, 0]]
+
+
+def test_dividend_matrix_ex_date():
+    dates = pd.to_datetime(["2023-09-01", "2023-09-04", "2023-09-05"])
+    divs = pd.DataFrame(
+        {
+            "ticker": ["AAA", "AAA", "AAA"],
+            # T+1: Monday record date, Sunday record date, after last date
+            "date": pd.to_datetime(["2023-09-04", "2023-09-03", "2023-09-10"]),
+            "dividends": [1.0, 2.0, 4.0],
+        }
+    )
+    D = dividend_matrix(dates, pd.Index(["AAA"]), divs, currency=None)
+    assert D[:, 0].tolist() == [2, 1, 0]
+    D = dividend_matrix(dates, pd.Index(["AAA"]), divs, currency=None, lag=1)
+    assert D[:, 0].tolist() == [1, 0, 0]
+
+
+def test_total_return_index():
+    tr = total_return_index(close, dividends, base=100)
+    assert np.allclose(tr["AAA"], [100, 100, 100, 100 * 95 / 90])
+    assert np.isnan(tr["BBB"].iloc[0])
+    assert np.allclose(tr["BBB"].iloc[1:], [100, 100, 120])
+
+
+def test_adjusted_prices_have_total_returns():
+    adj = adjusted_prices(close, dividends)
+    assert adj["AAA"].iloc[-1] == 95
+    tr = total_return_index(close, dividends)
+    assert np.allclose(adj["AAA"].pct_change(), tr["AAA"].pct_change(), equal_nan=True)
@@ -0,0 +1,41 @@
+import numpy as np
+
+import finec.trading_calendar
+from finec.trading_calendar import TradingCalendar, trading_calendar
+
+DAYS = ["2022-01-03", "2022-01-04", "2022-01-05", "2022-01-06", "2022-01-10"]
+
+
+def days(values):
+    return [str(d) for d in values]
+
+
+def test_calendar_slicing():
+    cal = TradingCalendar(DAYS[::-1])
+    assert days(cal.between("2022-01-04", "2022-01-07")) == DAYS[1:4]
+    assert days(cal.between(end="2022-01-03")) == DAYS[:1]
+    assert days(cal.after("2022-01-06")) == ["2022-01-10"]
+    assert "2022-01-05" in cal
+    assert "2022-01-08" not in cal
+    assert cal.last == "2022-01-10"
+
+
+def test_calendar_missing():
+    cal = TradingCalendar(DAYS)
+    assert days(cal.missing(["2022-01-03", "2022-01-10"])) == DAYS[1:4]
+    assert days(cal.missing(["2022-01-04"], start="2022-01-03")) == ["2022-01-03"]
+
+
+def test_calendar_updated_from_last_day(monkeypatch, tmpdir):
+    requested = []
+
+    def fake_fetch_dates(reference, start=""):
+        requested.append(start)
+        return np.array([d for d in DAYS if d >= start], dtype="datetime64[D]")
+
+    monkeypatch.setattr(finec.trading_calendar, "fetch_dates", fake_fetch_dates)
+    path = tmpdir / "calendar.npy"
+    assert len(trading_calendar(path=path)) == 5
+    assert len(trading_calendar(path=path)) == 5
+    assert len(trading_calendar(update=False, path=path)) == 5
+    assert requested == ["", "2022-01-11"]
@@ -1,4 +1,17 @@
-from finec.yield_curve import Y, yield_curve, get_yields_from_cbr, make_date, YieldCurve
+import numpy as np
+
+from finec.yield_curve import (
+    Curve,
+    Y,
+    YieldCurve,
+    IntradayCurves,
+    YieldCurveHistory,
+    get_yields_from_cbr,
+    intraday_matrix,
+    parameter_matrix,
+    make_date,
+    yield_curve,
+)
 
 params = {
     "tradedate": "2022-09-28",
@@ -23,6 +36,18 @@ def test_Y():
     assert round(Y(1, params), 2) == 830.24
 
 
+def test_Y_vectorized():
+    ts = np.array([0.5, 1, 5, 10])
+    expected = [Y(t, params) for t in ts]
+    assert np.allclose(Y(ts, params), expected)
+    assert np.allclose(Curve.from_params(params).rate(ts), expected)
+
+
+def test_discount():
+    df = Curve.from_params(params).discount([1, 2])
+    assert np.allclose(df, 1 / (1 + Y(np.array([1, 2]), params) / 10_000) ** [1, 2])
+
+
 def test_yield_curve():
     assert round(yield_curve("2022-09-28", 1), 2) == 830.24
 
@@ -31,6 +56,29 @@ def test_YieldCurve():
     assert round(YieldCurve("2022-09-28").rate(t=1), 2) == 830.24
 
 
+def test_YieldCurveHistory_surface():
+    dates, matrix = parameter_matrix([params, dict(params, tradedate="2022-09-29")])
+    h = YieldCurveHistory("2022-09-28", "2022-09-29", dates, matrix)
+    assert h.surface([1, 5]).shape == (2, 2)
+    assert round(h.surface(1)[0, 0], 2) == 830.24
+    assert round(h.curve("2022-09-28").rate(1), 2) == 830.24
+
+
+def test_YieldCurveHistory():
+    h = YieldCurveHistory("2022-09-26", "2022-09-30")
+    assert round(h.to_frame(1).loc["2022-09-28", 1], 2) == 830.24
+
+
+def test_IntradayCurves():
+    later = dict(params, tradetime="18:50:00", b1=params["b1"] + 10)
+    moments, matrix = intraday_matrix([params, later])
+    d = IntradayCurves("2022-09-28", moments, matrix)
+    assert d.surface([1, 2, 3]).shape == (2, 3)
+    assert d.changes([1, 2, 3]).shape == (1, 3)
+    assert (d.changes([1, 2, 3]) > 0).all()
+    assert round(d.as_of("2022-09-28T18:45").rate(1), 2) == 830.24
+
+
 def test_make_date():
     assert make_date("2022-09-28") == "28.09.2022"
 